@@ -1,38 +1,53 @@
 """
 Backpack Visual Demo Script
 Run this script to see a simulated demo of Backpack in action.
+
+Set FAST_DEMO=1 to print everything immediately (useful for CI smoke tests).
 """
 import os
 import sys
 import time
 
+FAST_DEMO = os.environ.get("FAST_DEMO") == "1"
+TYPE_CHUNK = 4
+
+
+def _sleep(seconds):
+    """Sleep for the given time unless FAST_DEMO is set."""
+    if not FAST_DEMO:
+        time.sleep(seconds)
 
 def type_print(text, delay=0.03):
-    """Simulate typing effect."""
-    for char in text:
-        sys.stdout.write(char)
+    """Simulate typing effect, writing a few characters per flush."""
+    if FAST_DEMO:
+        sys.stdout.write(text + "\n")
+        sys.stdout.flush()
+        return
+    for i in range(0, len(text), TYPE_CHUNK):
+        chunk = text[i:i + TYPE_CHUNK]
+        sys.stdout.write(chunk)
         sys.stdout.flush()
-        time.sleep(delay)
+        time.sleep(len(chunk) * delay)
     print()
 
 def step(text, pause=1.5):
     """Print a step description and pause."""
     print(f"\n👉 \033[1;36m{text}\033[0m")
-    time.sleep(pause)
+    _sleep(pause)
 
 def run_command(cmd, output_lines):
     """Simulate running a shell command."""
     type_print(f"$ {cmd}", delay=0.05)
-    time.sleep(0.5)
-    for line in output_lines:
-        print(line)
-        time.sleep(0.1)
-    time.sleep(1)
+    _sleep(0.5)
+    sys.stdout.write("\n".join(output_lines) + "\n")
+    sys.stdout.flush()
+    _sleep(len(output_lines) * 0.1)
+    _sleep(1)
 
 def main():
     os.system('cls' if os.name == 'nt' else 'clear')
     print("\n🎒 \033[1;33mBackpack Agent Container Demo\033[0m\n")
-    time.sleep(1)
+    _sleep(1)
 
     step("Scenario: You found an awesome agent on GitHub.")
     step("Problem: It needs API keys and configuration to run.")
@@ -56,16 +71,16 @@ def main():
     print("\033[1;33m[Backpack] This agent requires 'OPENAI_API_KEY'.\033[0m")
     print("\033[1;33m           You have this key in your personal vault.\033[0m")
     type_print("           Allow access for this session? (Y/n) ", delay=0.05)
-    time.sleep(1)
+    _sleep(1)
     type_print("Y", delay=0.2)
     
     print("\033[1;32m[OK] Key injected into process memory.\033[0m")
-    time.sleep(0.5)
+    _sleep(0.5)
     
     print("\n🚀 \033[1;32mAgent is running...\033[0m")
     print("   Personality: Senior Financial Analyst")
     print("   Output: The stock market is showing bullish trends...")
-    time.sleep(2)
+    _sleep(2)
     
     step("That's it! No .env files, no copy-pasting keys.")
     step("The agent traveled with its configuration, but your keys stayed safe.")
@@ -0,0 +1,18 @@
+"""
+Shared helpers for the example agents.
+
+Copy this file next to your own agent to reuse `require_env`.
+"""
+import os
+import sys
+from typing import Dict, Tuple
+
+
+def require_env(keys: Tuple[str, ...]) -> Dict[str, str]:
+    """Return the values of the given environment variables, or exit if any are missing."""
+    missing = [key for key in keys if not os.environ.get(key)]
+    if missing:
+        print(f"❌ Missing keys: {', '.join(missing)}")
+        print("   Add them using 'backpack key add <KEY_NAME>'")
+        sys.exit(1)
+    return {key: os.environ[key] for key in keys}
@@ -1,24 +1,72 @@
-
+import os
+import statistics
 import time
-from backpack.crypto import derive_key
 from unittest.mock import patch
 
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from backpack.crypto import clear_key_cache, derive_key, encrypt_with_key
+
+ITERATIONS = 50
+WARMUP = 3
+
+
+def _bench(label, func, iterations=ITERATIONS, warmup=WARMUP):
+    """Warm up, then time ``iterations`` calls of ``func`` and print min/median/mean."""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+
+    print(
+        f"{label:<28} min {min(samples) / 1e6:10.4f}ms  "
+        f"median {statistics.median(samples) / 1e6:10.4f}ms  "
+        f"mean {statistics.mean(samples) / 1e6:10.4f}ms"
+    )
+    return samples
+
+
 def test_speed():
-    start = time.time()
-    derive_key("password")
-    print(f"Original time: {time.time() - start:.4f}s")
-
-    with patch("backpack.crypto.PBKDF2HMAC") as mock_kdf:
-        # We need to make sure the mock behaves enough like the real thing if needed,
-        # but derive_key just calls kdf.derive().
-        # Actually, derive_key instantiates PBKDF2HMAC.
-        # So we mock the class.
-        mock_instance = mock_kdf.return_value
-        mock_instance.derive.return_value = b"x" * 32 # 32 bytes key
-        
-        start = time.time()
-        derive_key("password")
-        print(f"Mocked time: {time.time() - start:.4f}s")
+    salt = os.urandom(16)
+
+    def derive_uncached():
+        clear_key_cache()
+        derive_key("password", salt)
+
+    # Cache miss: derive_key's key cache is emptied before every call, so each
+    # call pays the full PBKDF2 cost
+    _bench("derive_key (cache miss)", derive_uncached)
+
+    # Cache hit: the warm-up call derives the key, repeats are lookups in
+    # derive_key's own cache
+    _bench("derive_key (cache hit)", lambda: derive_key("password", salt))
+
+    # Mocked KDF: the patch is applied once, outside the timed calls, and the
+    # cache is emptied per call so PBKDF2HMAC (the mock) is reached every time.
+    # This is the cost of derive_key's own bookkeeping with PBKDF2 taken out
+    with patch("cryptography.hazmat.primitives.kdf.pbkdf2.PBKDF2HMAC") as mock_kdf:
+        mock_kdf.return_value.derive.return_value = b"x" * 32
+        _bench("derive_key (mocked KDF)", derive_uncached)
+        assert mock_kdf.call_count == ITERATIONS + WARMUP
+    clear_key_cache()  # drop the mock-derived key so later rows use real ones
+
+    # Real PBKDF2 with a single iteration: the floor for any iteration-count tuning
+    def pbkdf2_one_iteration():
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=1)
+        kdf.derive(b"password")
+
+    _bench("PBKDF2 (iterations=1)", pbkdf2_one_iteration)
+
+    # Encryption alone, with the key derived once up front
+    key, salt = derive_key("password", salt)
+    payload = "x" * 4096
+    _bench("encrypt_with_key (4 KiB)", lambda: encrypt_with_key(payload, key, salt))
+
 
 if __name__ == "__main__":
     test_speed()
@@ -11,6 +11,7 @@ __version__ = "0.1.3"
 from .exceptions import (  # noqa: F401
     AgentLockCorruptedError,
     AgentLockError,
+    AgentLockExistsError,
     AgentLockNotFoundError,
     AgentLockReadError,
     AgentLockWriteError,
@@ -47,6 +48,7 @@ __all__ = [
     "AgentLockCorruptedError",
     "AgentLockReadError",
     "AgentLockWriteError",
+    "AgentLockExistsError",
     "ValidationError",
     "InvalidPathError",
     "InvalidKeyNameError",
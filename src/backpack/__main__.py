@@ -0,0 +1,28 @@
+"""
+Console entry point for `backpack` and `python -m backpack`.
+
+`backpack version` is answered here without importing the click-based CLI,
+whose imports dominate start-up for a command that only prints a string.
+Everything else is handed to backpack.cli unchanged.
+"""
+
+import sys
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the CLI for argv (default: sys.argv[1:])."""
+    args = sys.argv[1:] if argv is None else argv
+    if args == ["version"]:
+        from . import __version__
+
+        sys.stdout.write(f"backpack version {__version__}\n")
+        return
+
+    from .cli import cli
+
+    cli(args=args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+JSON helpers that use orjson when it is installed.
+
+orjson is an optional speedup (``pip install backpack-agent[fast]``). Without
+it the stdlib json module is used. Both paths read and write the same
+documents, so files produced by one can always be parsed by the other.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    orjson = None  # type: ignore[assignment]
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize obj to a JSON string.
+
+    Args:
+        obj: The object to serialize
+        indent: Pretty-print with a two-space indent
+
+    Returns:
+        The JSON document as a string
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, option=option).decode()
+        except TypeError:
+            # orjson rejects some values json accepts (e.g. integers wider
+            # than 64 bits); let json decide whether they are serializable.
+            pass
+    return json.dumps(obj, indent=2 if indent else None)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        data: The document as str or UTF-8 bytes
+
+    Returns:
+        The parsed object
+
+    Raises:
+        JSONDecodeError: If data is not valid JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # json also accepts NaN/Infinity, which it may have written itself.
+            pass
+    return json.loads(data)
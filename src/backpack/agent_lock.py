@@ -8,14 +8,26 @@ Logging in this module focuses on file paths and operation outcomes only.
 No decrypted contents are ever logged.
 """
 
-import json
 import logging
 import os
-from typing import Dict, Any, Optional
+import stat
+from typing import Any, Dict, NamedTuple, Optional, Tuple
 
+from . import _json
 from .audit import AuditLogger
-from .crypto import encrypt_data, decrypt_data, DecryptionError, EncryptionError
+from .crypto import (
+    DEFAULT_ITERATIONS,
+    DecryptionError,
+    EncryptionError,
+    decode_salt,
+    decrypt_with_key,
+    derive_key,
+    encrypt_many,
+    encrypt_with_key,
+    kdf_iterations,
+)
 from .exceptions import (
+    AgentLockExistsError,
     AgentLockNotFoundError,
     AgentLockReadError,
     AgentLockWriteError,
@@ -25,6 +37,23 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+REQUIRED_LAYERS = ("credentials", "personality", "memory")
+_REQUIRED_LAYER_SET = frozenset(REQUIRED_LAYERS)
+
+# How much of the file _load_layers() looks at before committing to a full parse,
+# and the bytes (UTF-8 BOM and JSON whitespace) allowed before the opening brace.
+_PROBE_SIZE = 512
+_PROBE_STRIP = b"\xef\xbb\xbf \t\r\n"
+
+
+class _CachedLock(NamedTuple):
+    """Envelope layers and their plaintexts as last read or written by an AgentLock."""
+
+    signature: Tuple[int, int, int]
+    master_key: str
+    layers: Dict[str, Dict[str, str]]
+    plaintexts: Dict[str, str]
+
 
 class AgentLock:
     """
@@ -49,8 +78,288 @@ class AgentLock:
         self.file_path = file_path
         self.master_key = master_key or os.environ.get("AGENT_MASTER_KEY", "default-key")
         self.audit_logger = AuditLogger()
+        # Envelope and decrypted layers from the last successful read or write, tagged
+        # with the file signature and master key they were produced under.
+        self._cache: Optional[_CachedLock] = None
+        # Derived keys by (master key, salt, iterations), so PBKDF2 runs at most once
+        # per salt for the lifetime of this instance. New writes reuse the last salt
+        # and iteration count seen, so a file keeps the KDF cost it was created with.
+        self._keys: Dict[Tuple[str, bytes, int], bytes] = {}
+        self._salt: Optional[bytes] = None
+        self._iterations = DEFAULT_ITERATIONS
+        # (key, plaintexts, layers) from a create(overwrite=False) that found the file
+        # already there, so a confirmed retry writes them without encrypting again
+        self._unwritten: Optional[Tuple[bytes, Dict[str, str], Dict[str, Dict[str, str]]]] = None
+
+    def _derive_key(self, salt: Optional[bytes] = None, iterations: Optional[int] = None) -> Tuple[bytes, bytes]:
+        """
+        Return a (key, salt) pair for the current master key, deriving only on a cache miss.
+
+        Args:
+            salt: Salt to derive with. If None, the salt of the last file read or
+                written by this instance is reused, or a fresh one is generated.
+            iterations: PBKDF2 iteration count. If None, the count of the last file
+                read by this instance is used (DEFAULT_ITERATIONS for a new file).
+        """
+        if salt is None:
+            salt = self._salt
+        if iterations is None:
+            iterations = self._iterations
+        if salt is not None:
+            key = self._keys.get((self.master_key, salt, iterations))
+            if key is not None:
+                return key, salt
+        key, salt = derive_key(self.master_key, salt, iterations)
+        self._keys[(self.master_key, salt, iterations)] = key
+        return key, salt
+
+    def _decrypt_layer(self, layer: Dict[str, Any]) -> str:
+        """Decrypt one encrypted layer from the envelope to its JSON plaintext."""
+        iterations = kdf_iterations(layer)
+        key, salt = self._derive_key(decode_salt(layer), iterations)
+        plaintext = decrypt_with_key(layer, key)
+        self._salt = salt
+        self._iterations = iterations
+        return plaintext
+
+    def _stat(self) -> Optional[os.stat_result]:
+        """Stat the lock file once, returning None if it cannot be stat'ed (e.g. missing)."""
+        try:
+            return os.stat(self.file_path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _signature(st: os.stat_result) -> Tuple[int, int, int]:
+        """Return a cheap identity for file contents: (inode, size, mtime in ns)."""
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _cached(self, signature: Optional[Tuple[int, int, int]]) -> Optional[_CachedLock]:
+        """Return the cache entry if it still matches the file and master key."""
+        cached = self._cache
+        if cached is None:
+            return None
+        if signature is None or cached.signature != signature or cached.master_key != self.master_key:
+            self._cache = None
+            return None
+        return cached
+
+    def _store_cache(
+        self,
+        signature: Optional[Tuple[int, int, int]],
+        layers: Dict[str, Dict[str, str]],
+        plaintexts: Dict[str, str],
+    ) -> None:
+        """Remember the envelope layers and their plaintexts for the given file signature."""
+        if signature is None:
+            self._cache = None
+        else:
+            self._cache = _CachedLock(signature, self.master_key, layers, plaintexts)
+
+    def _load_layers(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        Parse the envelope from disk and return its still-encrypted layers.
+
+        Returns:
+            The 'layers' mapping, or None if the file is not a valid agent.lock.
+
+        Raises:
+            AgentLockReadError: If reading the file fails (I/O/permissions).
+        """
+        try:
+            with open(self.file_path, "rb") as f:
+                # Cheap probe so obviously wrong files are rejected without
+                # reading or parsing the whole thing.
+                head = f.read(_PROBE_SIZE)
+                if not head.lstrip(_PROBE_STRIP).startswith(b"{"):
+                    logger.warning("agent.lock file is not a JSON object", extra={"path": self.file_path})
+                    return None
+                raw = head + f.read()
+            if b'"layers"' not in raw:
+                logger.warning("agent.lock missing 'layers' section", extra={"path": self.file_path})
+                return None
+            data = _json.loads(raw)
+        except _json.JSONDecodeError:
+            # Corrupted file (or wrong content) -> treat as unreadable
+            logger.warning("agent.lock file is not valid JSON", extra={"path": self.file_path})
+            return None
+        except PermissionError as e:
+            raise AgentLockReadError(self.file_path, f"Permission denied: {str(e)}") from e
+        except OSError as e:
+            raise AgentLockReadError(self.file_path, f"OS error: {str(e)}") from e
+        except Exception as e:
+            raise AgentLockReadError(self.file_path, f"Unexpected error reading file: {str(e)}") from e
+
+        # Validate file structure (treat invalid as unreadable). The JSON parser only
+        # ever produces plain dicts, so an exact type check is enough here.
+        if type(data) is not dict:
+            logger.warning("agent.lock file has invalid structure", extra={"path": self.file_path})
+            return None
+        layers = data.get("layers")
+        if type(layers) is not dict:
+            logger.warning("agent.lock missing 'layers' section", extra={"path": self.file_path})
+            return None
+
+        if not _REQUIRED_LAYER_SET.issubset(layers):
+            logger.warning(
+                "agent.lock missing required layer",
+                extra={"path": self.file_path, "layers": sorted(_REQUIRED_LAYER_SET.difference(layers))},
+            )
+            return None
+
+        return layers
+
+    def _write_layers(
+        self, layers: Dict[str, Dict[str, str]], plaintexts: Optional[Dict[str, str]], overwrite: bool = True
+    ) -> None:
+        """
+        Write encrypted layers to disk and refresh the cache.
+
+        Args:
+            layers: Encrypted layers as produced by encrypt_with_key()
+            plaintexts: The matching layer plaintexts to cache, or None if unknown
+            overwrite: Replace an existing file. If False the file is only created,
+                atomically, and an existing file is left untouched.
+
+        Raises:
+            AgentLockExistsError: If overwrite is False and the file already exists
+            AgentLockWriteError: If writing the file fails
+        """
+        import tempfile
+
+        payload = _json.dumps({"version": "1.0", "layers": layers}, indent=True)
+        tmp_path = None
+        try:
+            # Ensure directory exists
+            directory = os.path.dirname(self.file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Write a sibling temp file and rename it over the lock so that readers,
+            # and a crash mid-write, only ever see the old or the new file in full.
+            fd, tmp_path = tempfile.mkstemp(
+                dir=directory or ".", prefix=f".{os.path.basename(self.file_path)}.", suffix=".tmp"
+            )
+            with os.fdopen(fd, "w") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+                st = os.fstat(f.fileno())
+            if overwrite:
+                try:
+                    os.chmod(tmp_path, stat.S_IMODE(os.stat(self.file_path).st_mode))
+                except FileNotFoundError:
+                    pass
+                os.replace(tmp_path, self.file_path)
+            else:
+                self._move_new(tmp_path)
+            tmp_path = None
+        except AgentLockExistsError:
+            raise
+        except PermissionError as e:
+            raise AgentLockWriteError(self.file_path, f"Permission denied: {str(e)}") from e
+        except OSError as e:
+            raise AgentLockWriteError(self.file_path, f"OS error: {str(e)}") from e
+        except Exception as e:
+            raise AgentLockWriteError(self.file_path, f"Unexpected error: {str(e)}") from e
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+        if plaintexts is None:
+            self._cache = None
+        else:
+            # Rename keeps inode, size and mtime, so the temp file's stat is the lock's.
+            self._store_cache(self._signature(st), layers, plaintexts)
+
+    def _move_new(self, tmp_path: str) -> None:
+        """
+        Move the fully written temp file to the lock's name, failing if that name is taken.
+
+        A hard link is created or refused atomically, so there is no window between
+        checking for the file and creating it. Filesystems without hard links fall
+        back to a check followed by a rename.
+
+        Raises:
+            AgentLockExistsError: If the lock file already exists
+        """
+        try:
+            os.link(tmp_path, self.file_path)
+        except FileExistsError:
+            raise AgentLockExistsError(self.file_path) from None
+        except OSError:
+            if os.path.lexists(self.file_path):
+                raise AgentLockExistsError(self.file_path) from None
+            os.replace(tmp_path, self.file_path)
+            return
+        os.unlink(tmp_path)
+
+    def _update_layer(self, name: str, value: Dict[str, Any]) -> bool:
+        """
+        Re-encrypt a single layer and write it back.
 
-    def create(self, credentials: Dict[str, str], personality: Dict[str, str], memory: Dict[str, Any] = None) -> None:
+        The other layers keep their existing ciphertext, so only one encryption
+        is performed. The master key is checked against the stored layer before
+        anything is written, and nothing is written if the layer is unchanged.
+
+        Returns:
+            True if the file was rewritten, False if the layer already held this value.
+
+        Raises:
+            AgentLockNotFoundError: If the file doesn't exist or cannot be decrypted
+            AgentLockReadError: If reading the file fails
+            AgentLockWriteError: If writing the updated file fails
+        """
+        plaintext = _json.dumps(value)
+
+        st = self._stat()
+        cached = self._cached(None if st is None else self._signature(st))
+        plaintexts: Optional[Dict[str, str]]
+        current: Optional[str]
+        if cached is not None:
+            layers = dict(cached.layers)
+            plaintexts = dict(cached.plaintexts)
+            current = plaintexts.get(name)
+        else:
+            if st is None or not stat.S_ISREG(st.st_mode):
+                raise AgentLockNotFoundError(self.file_path)
+            loaded = self._load_layers()
+            if loaded is None:
+                raise AgentLockNotFoundError(self.file_path)
+            layers = dict(loaded)
+            plaintexts = None
+            try:
+                # Proves the master key before we write anything with it.
+                current = self._decrypt_layer(layers[name])
+            except (DecryptionError, ValidationError) as e:
+                logger.warning("Failed to decrypt agent.lock file", extra={"path": self.file_path})
+                raise AgentLockNotFoundError(self.file_path) from e
+
+        if current == plaintext:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "agent.lock layer unchanged, skipping write", extra={"path": self.file_path, "layer": name}
+                )
+            return False
+
+        iterations = kdf_iterations(layers[name])
+        key, salt = self._derive_key(decode_salt(layers[name]), iterations)
+        layers[name] = encrypt_with_key(plaintext, key, salt, iterations)
+        if plaintexts is not None:
+            plaintexts[name] = plaintext
+        self._write_layers(layers, plaintexts)
+        return True
+
+    def create(
+        self,
+        credentials: Dict[str, str],
+        personality: Dict[str, str],
+        memory: Dict[str, Any] = None,
+        overwrite: bool = True,
+    ) -> None:
         """
         Create a new agent.lock file with encrypted layers.
 
@@ -58,10 +367,14 @@ class AgentLock:
             credentials: Dictionary mapping credential names to placeholder values
             personality: Dictionary containing system prompts and configuration
             memory: Optional dictionary for ephemeral agent state (default: empty dict)
+            overwrite: Replace an existing agent.lock (default). If False, an existing
+                file raises AgentLockExistsError; the check and the create are one
+                atomic step, so a file appearing concurrently is never clobbered.
 
         Raises:
             ValidationError: If input data is invalid
             EncryptionError: If encryption fails
+            AgentLockExistsError: If overwrite is False and the file already exists
             AgentLockWriteError: If writing the file fails
         """
         if memory is None:
@@ -77,111 +390,169 @@ class AgentLock:
         if not isinstance(memory, dict):
             raise ValidationError("Memory must be a dictionary", f"Got type: {type(memory).__name__}")
 
+        plaintexts = {
+            "credentials": _json.dumps(credentials),
+            "personality": _json.dumps(personality),
+            "memory": _json.dumps(memory),
+        }
+
         try:
-            data = {
-                "version": "1.0",
-                "layers": {
-                    "credentials": encrypt_data(json.dumps(credentials), self.master_key),
-                    "personality": encrypt_data(json.dumps(personality), self.master_key),
-                    "memory": encrypt_data(json.dumps(memory), self.master_key),
-                },
-            }
+            key, salt = self._derive_key()
+            unwritten, self._unwritten = self._unwritten, None
+            if unwritten is not None and unwritten[0] == key and unwritten[1] == plaintexts:
+                layers = unwritten[2]
+            else:
+                layers = dict(zip(plaintexts, encrypt_many(plaintexts.values(), key, salt, self._iterations)))
         except (EncryptionError, ValidationError) as e:
             raise AgentLockWriteError(self.file_path, f"Failed to encrypt data: {str(e)}") from e
 
+        # Remembered before writing, so a retry after AgentLockExistsError finds
+        # this salt's key in self._keys instead of deriving under a new salt
+        self._salt = salt
         try:
-            # Ensure directory exists
-            directory = os.path.dirname(self.file_path)
-            if directory and not os.path.exists(directory):
-                os.makedirs(directory, exist_ok=True)
-
-            with open(self.file_path, "w") as f:
-                json.dump(data, f, indent=2)
-            logger.info("Created agent.lock file", extra={"path": self.file_path})
-            self.audit_logger.log_event("lock_created", {"path": self.file_path})
-        except PermissionError as e:
-            raise AgentLockWriteError(self.file_path, f"Permission denied: {str(e)}") from e
-        except OSError as e:
-            raise AgentLockWriteError(self.file_path, f"OS error: {str(e)}") from e
-        except Exception as e:
-            raise AgentLockWriteError(self.file_path, f"Unexpected error: {str(e)}") from e
+            self._write_layers(layers, plaintexts, overwrite=overwrite)
+        except AgentLockExistsError:
+            self._unwritten = (key, plaintexts, layers)
+            raise
+        logger.info("Created agent.lock file", extra={"path": self.file_path})
+        self.audit_logger.log_event("lock_created", {"path": self.file_path})
 
-    def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+    def _read_layers(self, names: Tuple[str, ...]) -> Optional[Dict[str, Dict[str, Any]]]:
         """
-        Read and decrypt the agent.lock file.
+        Read and decrypt only the named layers of the agent.lock file.
+
+        Layers already decrypted for the current file contents are served from
+        the cache; the others are decrypted and added to it.
 
         Returns:
-            A dictionary with keys 'credentials', 'personality', and 'memory',
-            each containing the decrypted data. Returns None if the file doesn't
-            exist or decryption fails.
+            A dictionary mapping each requested layer name to its decrypted data,
+            or None if the file doesn't exist or decryption fails.
 
         Raises:
             AgentLockReadError: If reading the file fails (I/O/permissions).
             InvalidPathError: If the path exists but is not a file.
         """
-        if not os.path.exists(self.file_path):
-            logger.debug("agent.lock file not found", extra={"path": self.file_path})
+        # A single stat both checks the path and keys the cache. It happens before
+        # opening so a concurrent rewrite can only make the cache entry look older
+        # than its contents, never newer.
+        st = self._stat()
+        if st is None:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("agent.lock file not found", extra={"path": self.file_path})
             return None
 
-        if not os.path.isfile(self.file_path):
+        if not stat.S_ISREG(st.st_mode):
             raise InvalidPathError(self.file_path, "Path exists but is not a file")
 
-        try:
-            with open(self.file_path, "r") as f:
-                data = json.load(f)
-        except json.JSONDecodeError:
-            # Corrupted file (or wrong content) -> treat as unreadable
-            logger.warning("agent.lock file is not valid JSON", extra={"path": self.file_path})
-            return None
-        except PermissionError as e:
-            raise AgentLockReadError(self.file_path, f"Permission denied: {str(e)}") from e
-        except OSError as e:
-            raise AgentLockReadError(self.file_path, f"OS error: {str(e)}") from e
-        except Exception as e:
-            raise AgentLockReadError(self.file_path, f"Unexpected error reading file: {str(e)}") from e
-
-        # Validate file structure (treat invalid as unreadable)
-        if not isinstance(data, dict):
-            logger.warning("agent.lock file has invalid structure", extra={"path": self.file_path})
-            return None
-        if "layers" not in data or not isinstance(data["layers"], dict):
-            logger.warning("agent.lock missing 'layers' section", extra={"path": self.file_path})
-            return None
-
-        required_layers = ["credentials", "personality", "memory"]
-        for layer in required_layers:
-            if layer not in data["layers"]:
-                logger.warning(
-                    "agent.lock missing required layer",
-                    extra={"path": self.file_path, "layer": layer},
-                )
+        signature = self._signature(st)
+        cached = self._cached(signature)
+        if cached is not None and all(name in cached.plaintexts for name in names):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Read agent.lock from cache", extra={"path": self.file_path})
+            self.audit_logger.log_event("lock_read", {"path": self.file_path})
+            return {name: _json.loads(cached.plaintexts[name]) for name in names}
+
+        if cached is not None:
+            layers = cached.layers
+            plaintexts = dict(cached.plaintexts)
+        else:
+            loaded = self._load_layers()
+            if loaded is None:
                 return None
+            layers = loaded
+            plaintexts = {}
 
         try:
-            result = {
-                "credentials": json.loads(decrypt_data(data["layers"]["credentials"], self.master_key)),
-                "personality": json.loads(decrypt_data(data["layers"]["personality"], self.master_key)),
-                "memory": json.loads(decrypt_data(data["layers"]["memory"], self.master_key)),
-            }
-            logger.debug("Successfully read agent.lock file", extra={"path": self.file_path})
+            for name in names:
+                if name not in plaintexts:
+                    plaintexts[name] = self._decrypt_layer(layers[name])
+            result = {name: _json.loads(plaintexts[name]) for name in names}
+            self._store_cache(signature, layers, plaintexts)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Successfully read agent.lock file", extra={"path": self.file_path})
             self.audit_logger.log_event("lock_read", {"path": self.file_path})
             return result
         except DecryptionError:
             logger.warning("Failed to decrypt agent.lock file", extra={"path": self.file_path})
             return None
-        except json.JSONDecodeError:
+        except _json.JSONDecodeError:
             logger.warning("Decrypted agent.lock contents are not valid JSON", extra={"path": self.file_path})
             return None
         except Exception as e:
             logger.error("Unexpected error reading agent.lock file", extra={"path": self.file_path, "error": str(e)})
             return None
 
+    def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Read and decrypt the agent.lock file.
+
+        Returns:
+            A dictionary with keys 'credentials', 'personality', and 'memory',
+            each containing the decrypted data. Returns None if the file doesn't
+            exist or decryption fails.
+
+        Raises:
+            AgentLockReadError: If reading the file fails (I/O/permissions).
+            InvalidPathError: If the path exists but is not a file.
+        """
+        return self._read_layers(REQUIRED_LAYERS)
+
+    def read_layer(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Read and decrypt a single layer of the agent.lock file.
+
+        Args:
+            name: One of 'credentials', 'personality' or 'memory'
+
+        Returns:
+            The layer's decrypted data, or None if the file doesn't exist or
+            decryption fails.
+
+        Raises:
+            ValidationError: If name is not a known layer
+            AgentLockReadError: If reading the file fails (I/O/permissions).
+            InvalidPathError: If the path exists but is not a file.
+        """
+        if name not in _REQUIRED_LAYER_SET:
+            raise ValidationError(f"Unknown layer: {name}", f"Expected one of: {', '.join(REQUIRED_LAYERS)}")
+        data = self._read_layers((name,))
+        return None if data is None else data[name]
+
+    def read_personality(self) -> Optional[Dict[str, Any]]:
+        """
+        Read and decrypt only the personality layer of the agent.lock file.
+
+        Returns:
+            The personality dictionary, or None if the file doesn't exist or
+            decryption fails.
+
+        Raises:
+            AgentLockReadError: If reading the file fails (I/O/permissions).
+            InvalidPathError: If the path exists but is not a file.
+        """
+        return self.read_layer("personality")
+
+    def read_memory(self) -> Optional[Dict[str, Any]]:
+        """
+        Read and decrypt only the memory layer of the agent.lock file.
+
+        Returns:
+            The memory dictionary, or None if the file doesn't exist or
+            decryption fails.
+
+        Raises:
+            AgentLockReadError: If reading the file fails (I/O/permissions).
+            InvalidPathError: If the path exists but is not a file.
+        """
+        return self.read_layer("memory")
+
     def update_memory(self, memory: Dict[str, Any]) -> None:
         """
         Update the memory layer of the agent.lock file.
 
         This preserves existing credentials and personality while updating
-        only the ephemeral memory state.
+        only the ephemeral memory state. Only the memory layer is re-encrypted,
+        and the file is left untouched if the memory is unchanged.
 
         Args:
             memory: New memory dictionary to store
@@ -194,15 +565,12 @@ class AgentLock:
         if not isinstance(memory, dict):
             raise ValidationError("Memory must be a dictionary", f"Got type: {type(memory).__name__}")
 
-        agent_data = self.read()
-        if agent_data is None:
-            raise AgentLockNotFoundError(self.file_path)
-
         try:
-            agent_data["memory"] = memory
-            self.create(agent_data["credentials"], agent_data["personality"], memory)
-            self.audit_logger.log_event("lock_memory_updated", {"path": self.file_path})
-        except (ValidationError, EncryptionError, AgentLockWriteError):
+            if self._update_layer("memory", memory):
+                self.audit_logger.log_event("lock_memory_updated", {"path": self.file_path})
+            else:
+                self.audit_logger.log_event("lock_memory_unchanged", {"path": self.file_path})
+        except (AgentLockNotFoundError, AgentLockReadError, ValidationError, EncryptionError, AgentLockWriteError):
             raise
         except Exception as e:
             raise AgentLockWriteError(self.file_path, f"Failed to update memory: {str(e)}") from e
@@ -212,7 +580,8 @@ class AgentLock:
         Update the personality layer of the agent.lock file.
 
         This preserves existing credentials and memory while updating
-        only the personality configuration.
+        only the personality configuration. Only the personality layer is
+        re-encrypted.
 
         Args:
             personality: New personality dictionary to store
@@ -225,15 +594,12 @@ class AgentLock:
         if not isinstance(personality, dict):
             raise ValidationError("Personality must be a dictionary", f"Got type: {type(personality).__name__}")
 
-        agent_data = self.read()
-        if agent_data is None:
-            raise AgentLockNotFoundError(self.file_path)
-
         try:
-            agent_data["personality"] = personality
-            self.create(agent_data["credentials"], personality, agent_data["memory"])
-            self.audit_logger.log_event("lock_personality_updated", {"path": self.file_path})
-        except (ValidationError, EncryptionError, AgentLockWriteError):
+            if self._update_layer("personality", personality):
+                self.audit_logger.log_event("lock_personality_updated", {"path": self.file_path})
+            else:
+                self.audit_logger.log_event("lock_personality_unchanged", {"path": self.file_path})
+        except (AgentLockNotFoundError, AgentLockReadError, ValidationError, EncryptionError, AgentLockWriteError):
             raise
         except Exception as e:
             raise AgentLockWriteError(self.file_path, f"Failed to update personality: {str(e)}") from e
@@ -242,6 +608,8 @@ class AgentLock:
         """
         Get a list of required credential keys from the agent.lock file.
 
+        Only the credentials layer is decrypted.
+
         Returns:
             A list of credential key names (e.g., ['OPENAI_API_KEY', 'TWITTER_TOKEN'])
 
@@ -249,10 +617,7 @@ class AgentLock:
             AgentLockNotFoundError: If agent.lock file doesn't exist
             AgentLockCorruptedError: If the file is corrupted
         """
-        agent_data = self.read()
-        if agent_data is None:
-            return []
-
-        if "credentials" in agent_data and isinstance(agent_data["credentials"], dict):
-            return list(agent_data["credentials"].keys())
+        credentials = self.read_layer("credentials")
+        if isinstance(credentials, dict):
+            return list(credentials.keys())
         return []
@@ -5,13 +5,21 @@ This module provides the AuditLogger class for creating an encrypted, tamper-evi
 log of sensitive operations like key injection and lock file access.
 """
 
-import json
 import logging
 import os
 import time
-from typing import Any, Dict, List, Optional
-
-from .crypto import DecryptionError, decrypt_data, encrypt_data
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import _json
+from .crypto import (
+    DecryptionError,
+    ValidationError,
+    decode_salt,
+    decrypt_with_key,
+    derive_key,
+    encrypt_with_key,
+    kdf_iterations,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +41,9 @@ class AuditLogger:
         """
         self.file_path = file_path
         self.master_key = os.environ.get("AGENT_MASTER_KEY", "default-key")
+        # (key, salt) derived from master_key on the first event and reused for
+        # every entry this logger writes; each entry still gets its own nonce
+        self._data_key: Optional[Tuple[bytes, bytes]] = None
 
     def log_event(self, event_type: str, details: Optional[Dict[str, Any]] = None) -> None:
         """
@@ -54,18 +65,20 @@ class AuditLogger:
 
         try:
             # Serialize and encrypt the entry
-            json_str = json.dumps(entry)
-            encrypted_data = encrypt_data(json_str, self.master_key)
-            
+            json_str = _json.dumps(entry)
+            if self._data_key is None:
+                self._data_key = derive_key(self.master_key)
+            encrypted_data = encrypt_with_key(json_str, *self._data_key)
+
             # We store the encrypted dict as a single line JSON
-            # encrypt_data returns {'data': '...', 'salt': '...'}
-            log_line = json.dumps(encrypted_data)
-            
+            # encrypt_with_key returns {'data': '...', 'salt': '...'}
+            log_line = _json.dumps(encrypted_data)
+
             with open(self.file_path, "a") as f:
                 f.write(log_line + "\n")
-                
+
         except Exception as e:
-            # We explicitly catch errors here to prevent audit logging failures 
+            # We explicitly catch errors here to prevent audit logging failures
             # from crashing the main application, but we log the error to system logs.
             logger.error(f"Failed to write to audit log: {e}")
 
@@ -73,6 +86,9 @@ class AuditLogger:
         """
         Read and decrypt all entries from the audit log.
 
+        Lines written by one logger share a salt, so the key for each distinct
+        salt is derived once and reused for every line that records it.
+
         Returns:
             List of decrypted log entries sorted by timestamp.
         """
@@ -80,6 +96,7 @@ class AuditLogger:
             return []
 
         entries = []
+        keys: Dict[Tuple[str, int], bytes] = {}
         try:
             with open(self.file_path, "r") as f:
                 for line_num, line in enumerate(f, 1):
@@ -88,11 +105,15 @@ class AuditLogger:
                         continue
                         
                     try:
-                        encrypted_dict = json.loads(line)
-                        decrypted_json = decrypt_data(encrypted_dict, self.master_key)
-                        entry = json.loads(decrypted_json)
+                        encrypted_dict = _json.loads(line)
+                        params = (encrypted_dict["salt"], kdf_iterations(encrypted_dict))
+                        key = keys.get(params)
+                        if key is None:
+                            key = keys[params] = derive_key(self.master_key, decode_salt(encrypted_dict), params[1])[0]
+                        decrypted_json = decrypt_with_key(encrypted_dict, key)
+                        entry = _json.loads(decrypted_json)
                         entries.append(entry)
-                    except (json.JSONDecodeError, DecryptionError) as e:
+                    except (_json.JSONDecodeError, DecryptionError, ValidationError) as e:
                         logger.warning(f"Failed to decrypt audit log line {line_num}: {e}")
                         # We continue reading other lines
                         continue
@@ -4,43 +4,106 @@ Command-line interface for Backpack Agent Container System.
 This module provides CLI commands for managing agents, keys, and running
 agents with JIT variable injection.
 
-Logging is configured here for CLI usage. By default it logs at INFO level,
-and can be controlled via the BACKPACK_LOG_LEVEL environment variable.
+Logging is configured here for CLI usage when a command runs (not on import
+or --help). By default it logs at INFO level, and can be controlled via the
+BACKPACK_LOG_LEVEL environment variable.
 """
 
-import json
+import atexit
+import functools
 import logging
+import logging.handlers
 import os
-import platform
-import shutil
-import subprocess
+import queue
+import re
 import sys
-import zipfile
-from typing import Dict, List
+from typing import Dict, List, Set, Tuple
 
 import click
 
-from . import __version__
+from . import __version__, _json
 from .agent_lock import AgentLock
-from .exceptions import AgentLockNotFoundError, AgentLockReadError, BackpackError, KeyNotFoundError, ValidationError
+from .exceptions import (
+    AgentLockExistsError,
+    AgentLockNotFoundError,
+    AgentLockReadError,
+    BackpackError,
+    KeyNotFoundError,
+    ValidationError,
+)
 from .keychain import (
     InvalidKeyNameError,
     KeychainDeletionError,
     KeychainStorageError,
     delete_key,
     get_key,
+    get_keys,
     list_keys,
     register_key,
     store_key,
 )
 
+# Credential names double as environment variable names
+_CRED_NAME_RE = re.compile(r"[A-Za-z0-9_]+")
+_CRED_SPLIT_RE = re.compile(r"[,\s]+")
+
+# Prefix marking a credential value in agent.lock as "not yet supplied"
+_PLACEHOLDER = "placeholder_"
+
+
+class _CredName(click.ParamType):
+    """A credential name, checked by click before the command body runs."""
+
+    name = "cred_name"
+
+    def convert(self, value, param, ctx):
+        if not _CRED_NAME_RE.fullmatch(value):
+            self.fail(
+                f"Invalid credential name: {value}. "
+                "Credential names must contain only alphanumeric characters and underscores",
+                param,
+                ctx,
+            )
+        return value
+
+
+class _CredList(click.ParamType):
+    """A comma-separated list of credential names, parsed into a list."""
+
+    name = "cred_list"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, list):
+            return value
+        names = (cred.strip() for cred in value.split(","))
+        return [_CRED_NAME.convert(cred_name, param, ctx) for cred_name in names if cred_name]
+
+
+_CRED_NAME = _CredName()
+_CRED_LIST = _CredList()
+
+
+def _start_file_logging(log_file: str) -> logging.Handler:
+    """
+    Start a background listener writing to log_file and return the handler that feeds it.
+
+    The FileHandler is opened lazily (delay=True) and the listener is stopped at
+    exit so queued records are flushed.
+    """
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, logging.FileHandler(log_file, delay=True))
+    listener.start()
+    atexit.register(listener.stop)
+    return logging.handlers.QueueHandler(log_queue)
+
 
 def _configure_logging() -> logging.Logger:
     """
     Configure a default logger for CLI usage if none is configured.
 
     The log level can be overridden with BACKPACK_LOG_LEVEL (e.g. DEBUG, INFO).
-    Can log to a file if BACKPACK_LOG_FILE is set.
+    Can log to a file if BACKPACK_LOG_FILE is set; file writes happen on a
+    background thread so slow storage never delays output on stderr.
     """
     root = logging.getLogger()
     if not root.handlers:
@@ -51,7 +114,7 @@ def _configure_logging() -> logging.Logger:
         
         log_file = os.environ.get("BACKPACK_LOG_FILE")
         if log_file:
-            handlers.append(logging.FileHandler(log_file))
+            handlers.append(_start_file_logging(log_file))
             
         logging.basicConfig(
             level=level, 
@@ -62,7 +125,14 @@ def _configure_logging() -> logging.Logger:
     return logging.getLogger(__name__)
 
 
-logger = _configure_logging()
+logger = logging.getLogger(__name__)
+
+
+_ERROR_TIPS = {
+    KeyNotFoundError: "List available keys with 'backpack key list'",
+    AgentLockNotFoundError: "Initialize an agent with 'backpack init' or 'backpack quickstart'",
+    AgentLockReadError: "Check file permissions or if the file is corrupted.",
+}
 
 
 def handle_error(e: Exception, exit_code: int = 1) -> None:
@@ -73,29 +143,29 @@ def handle_error(e: Exception, exit_code: int = 1) -> None:
         e: The exception to handle
         exit_code: Exit code to use (default: 1)
     """
+    # The message is assembled first and written to stderr in one call
+    lines: List[str] = []
     if isinstance(e, BackpackError):
         logger.error("Backpack error", extra={"type": type(e).__name__, "error_message": e.message})
-        click.echo(click.style(f"Error: {e.message}", fg="red"), err=True)
+        lines.append(click.style(f"Error: {e.message}", fg="red"))
         if e.details:
-            click.echo(click.style(f"  {e.details}", fg="yellow"), err=True)
-            
+            lines.append(click.style(f"  {e.details}", fg="yellow"))
+
         # Add helpful tips based on exception type
-        if isinstance(e, KeyNotFoundError):
-            click.echo(click.style("  💡 Tip: List available keys with 'backpack key list'", fg="cyan"), err=True)
-        elif isinstance(e, AgentLockNotFoundError):
-            click.echo(click.style("  💡 Tip: Initialize an agent with 'backpack init' or 'backpack quickstart'", fg="cyan"), err=True)
-        elif isinstance(e, AgentLockReadError):
-            click.echo(click.style("  💡 Tip: Check file permissions or if the file is corrupted.", fg="cyan"), err=True)
-            
+        tip = next((_ERROR_TIPS[cls] for cls in type(e).__mro__ if cls in _ERROR_TIPS), None)
+        if tip:
+            lines.append(click.style(f"  💡 Tip: {tip}", fg="cyan"))
+
     elif isinstance(e, click.ClickException):
         raise e
     else:
         logger.error("Unexpected error in CLI", extra={"type": type(e).__name__, "error": str(e)})
-        click.echo(click.style(f"Unexpected error: {str(e)}", fg="red"), err=True)
+        lines.append(click.style(f"Unexpected error: {str(e)}", fg="red"))
         if hasattr(e, "__cause__") and e.__cause__:
-            click.echo(click.style(f"  Caused by: {str(e.__cause__)}", fg="yellow"), err=True)
-        click.echo(click.style("  💡 Tip: Run with BACKPACK_LOG_LEVEL=DEBUG for more details.", fg="cyan"), err=True)
+            lines.append(click.style(f"  Caused by: {str(e.__cause__)}", fg="yellow"))
+        lines.append(click.style("  💡 Tip: Run with BACKPACK_LOG_LEVEL=DEBUG for more details.", fg="cyan"))
 
+    click.echo("\n".join(lines), err=True)
     sys.exit(exit_code)
 
 
@@ -107,6 +177,7 @@ def cli():
     A secure system for managing AI agents with encrypted state,
     credentials, and personality configurations.
     """
+    _configure_logging()
 
 
 @cli.command()
@@ -144,13 +215,10 @@ def quickstart(non_interactive):
             )
 
         creds: Dict[str, str] = {}
-        for cred in creds_input.replace(",", " ").split():
-            c = cred.strip()
-            if not c:
-                continue
-            if not c.replace("_", "").isalnum():
+        for c in _CRED_SPLIT_RE.split(creds_input):
+            if not _CRED_NAME_RE.fullmatch(c):
                 continue
-            creds[c] = f"placeholder_{c.lower()}"
+            creds[c] = _PLACEHOLDER + c.lower()
 
         if not creds:
             creds = {"OPENAI_API_KEY": "placeholder_openai_api_key"}
@@ -205,35 +273,29 @@ if __name__ == "__main__":
 
 
 @cli.command()
-@click.option("--credentials", help="Comma-separated list of required credentials (e.g., OPENAI_API_KEY,TWITTER_TOKEN)")
+@click.option(
+    "--credentials",
+    type=_CRED_LIST,
+    help="Comma-separated list of required credentials (e.g., OPENAI_API_KEY,TWITTER_TOKEN)",
+)
 @click.option("--personality", help="Agent personality prompt")
 def init(credentials, personality):
     """
     Initialize a new agent.lock file.
     """
     try:
-        creds: Dict[str, str] = {}
-        if credentials:
-            for cred in credentials.split(","):
-                cred_name = cred.strip()
-                if not cred_name:
-                    continue
-                if not cred_name.replace("_", "").isalnum():
-                    raise ValidationError(
-                        f"Invalid credential name: {cred_name}",
-                        "Credential names must contain only alphanumeric characters and underscores",
-                    )
-                creds[cred_name] = f"placeholder_{cred_name.lower()}"
+        creds = {cred_name: _PLACEHOLDER + cred_name.lower() for cred_name in credentials or ()}
 
         personality_data = {"system_prompt": personality or "You are a helpful AI assistant.", "tone": "professional"}
 
         agent_lock = AgentLock()
-        if os.path.exists(agent_lock.file_path):
+        try:
+            agent_lock.create(creds, personality_data, overwrite=False)
+        except AgentLockExistsError:
             if not click.confirm("agent.lock already exists. Overwrite it?"):
                 click.echo("Cancelled.")
                 return
-
-        agent_lock.create(creds, personality_data)
+            agent_lock.create(creds, personality_data)
         click.echo(click.style(f"[OK] Created agent.lock with {len(creds)} credential placeholders", fg="green"))
     except BackpackError as e:
         handle_error(e)
@@ -292,6 +354,37 @@ def rotate(new_key, key_file):
         sys.exit(1)
 
 
+_KEY_SOURCE_NOTES = {"agent.lock": " (found in agent.lock)", "vault": " (found in vault)"}
+
+
+def _confirm_key_access(offered: List[Tuple[str, str, str]]) -> Set[str]:
+    """
+    Ask once which of the offered keys the agent may receive and return their names.
+
+    A single key keeps the familiar one-line question. Several keys are listed
+    together behind one confirmation; declining it lets the user name a subset.
+    """
+    if not offered:
+        return set()
+
+    if len(offered) == 1:
+        key_name, _, source = offered[0]
+        msg = f"This agent requires access to {key_name}{_KEY_SOURCE_NOTES.get(source, '')}"
+        return {key_name} if click.confirm(f"{msg}. Allow access?") else set()
+
+    lines = ["This agent requires access to:"]
+    lines.extend(f"  - {key_name}{_KEY_SOURCE_NOTES.get(source, '')}" for key_name, _, source in offered)
+    click.echo("\n".join(lines))
+    names = {key_name for key_name, _, _ in offered}
+    if click.confirm("Allow access?"):
+        return names
+
+    subset = click.prompt(
+        "Keys to allow (comma-separated, empty to deny all)", default="", show_default=False
+    )
+    return names.intersection(_CRED_SPLIT_RE.split(subset.strip()))
+
+
 @cli.command()
 @click.argument("script_path")
 @click.option("--non-interactive", is_flag=True, help="Skip prompts (auto-approve keys) - enabled automatically if AGENT_MASTER_KEY is set")
@@ -299,6 +392,7 @@ def run(script_path, non_interactive):
     """
     Run an agent with JIT variable injection.
     """
+    import subprocess
     agent_lock = AgentLock()
     agent_data = agent_lock.read()
 
@@ -316,6 +410,15 @@ def run(script_path, non_interactive):
     creds_layer = agent_data.get("credentials", {})
     required_keys = list(creds_layer.keys())
 
+    # Fetch every key that only the vault can supply in a single pass
+    missing = [
+        k for k in required_keys
+        if k not in os.environ and (not creds_layer[k] or creds_layer[k].startswith(_PLACEHOLDER))
+    ]
+    vault = get_keys(missing) if missing else {}
+
+    # (name, value, source) for every key that needs the user's consent
+    offered: List[Tuple[str, str, str]] = []
     for key_name in required_keys:
         value_to_inject = None
         source = None
@@ -328,13 +431,13 @@ def run(script_path, non_interactive):
         # If the value in agent.lock is NOT a placeholder, it's a real encrypted key
         elif key_name in creds_layer:
              val = creds_layer[key_name]
-             if val and not val.startswith("placeholder_"):
+             if val and not val.startswith(_PLACEHOLDER):
                  value_to_inject = val
                  source = "agent.lock"
 
         # 3. Check Local Vault (Keychain)
         if not source and not value_to_inject:
-             stored_key = get_key(key_name)
+             stored_key = vault.get(key_name)
              if stored_key:
                  value_to_inject = stored_key
                  source = "vault"
@@ -346,33 +449,30 @@ def run(script_path, non_interactive):
                  click.echo(f"Key {key_name} found in environment.")
              continue
         
-        if value_to_inject:
-            if is_cloud_mode:
-                # Cloud/Non-interactive: Auto-approve
-                env_vars[key_name] = value_to_inject
-            else:
-                # Local/Interactive: Prompt user
-                msg = f"This agent requires access to {key_name}"
-                if source == "agent.lock":
-                    msg += " (found in agent.lock)"
-                elif source == "vault":
-                    msg += " (found in vault)"
-                
-                if click.confirm(f"{msg}. Allow access?"):
-                    env_vars[key_name] = value_to_inject
-                else:
-                    click.echo(f"Access denied for {key_name}. Agent may not function properly.")
+        if value_to_inject and source:
+            offered.append((key_name, value_to_inject, source))
         else:
             # Key not found anywhere
             click.echo(f"Key {key_name} not found in environment, agent.lock, or vault.")
             click.echo(f"  Add it with 'backpack key add {key_name}' or set it as an environment variable.")
 
+    if is_cloud_mode:
+        # Cloud/Non-interactive: Auto-approve
+        allowed = {key_name for key_name, _, _ in offered}
+    else:
+        # Local/Interactive: ask once for every key that needs consent
+        allowed = _confirm_key_access(offered)
+    for key_name, value_to_inject, _ in offered:
+        if key_name in allowed:
+            env_vars[key_name] = value_to_inject
+        else:
+            click.echo(f"Access denied for {key_name}. Agent may not function properly.")
+
     env_vars["AGENT_SYSTEM_PROMPT"] = agent_data["personality"]["system_prompt"]
     env_vars["AGENT_TONE"] = agent_data["personality"]["tone"]
 
-    # Merge injected env vars with current environment
-    env = os.environ.copy()
-    env.update(env_vars)
+    # Merge injected env vars with current environment in a single dict build
+    env = {**os.environ, **env_vars}
 
     click.echo(f"Running {script_path} with {len(env_vars)} injected variables...")
     
@@ -440,8 +540,12 @@ def remove_key(key_name):
         handle_error(e)
 
 
+@functools.lru_cache(maxsize=None)
 def _get_templates_dir() -> str:
-    """Return path to backpack/templates (works when installed or run from source)."""
+    """Return path to backpack/templates (works when installed or run from source).
+
+    The location can't change while the process runs, so it is resolved once.
+    """
     try:
         # Prefer stdlib resource APIs when available.
         try:
@@ -466,9 +570,12 @@ def _get_templates_dir() -> str:
 def _list_template_names() -> List[str]:
     """Return list of template directory names."""
     root = _get_templates_dir()
-    if not os.path.isdir(root):
+    try:
+        # DirEntry.is_dir() uses the type from the directory listing, so no stat per entry
+        with os.scandir(root) as entries:
+            return [e.name for e in entries if not e.name.startswith(".") and e.is_dir()]
+    except OSError:
         return []
-    return [d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)) and not d.startswith(".")]
 
 
 @cli.group()
@@ -487,17 +594,15 @@ def template_list():
     root = _get_templates_dir()
     for name in sorted(names):
         manifest_path = os.path.join(root, name, "manifest.json")
-        if os.path.isfile(manifest_path):
-            try:
-                with open(manifest_path) as f:
-                    m = json.load(f)
-                desc = m.get("description", "")
-                click.echo(f"  {name}")
-                if desc:
-                    click.echo(click.style(f"    {desc}", fg="white"))
-            except (json.JSONDecodeError, OSError):
-                click.echo(f"  {name}")
-        else:
+        try:
+            with open(manifest_path, "rb") as f:
+                m = _json.loads(f.read())
+            desc = m.get("description", "")
+            click.echo(f"  {name}")
+            if desc:
+                click.echo(click.style(f"    {desc}", fg="white"))
+        except (_json.JSONDecodeError, OSError):
+            # Missing or unreadable manifest: list the name without a description
             click.echo(f"  {name}")
 
 
@@ -506,6 +611,8 @@ def template_list():
 @click.option("--dir", "target_dir", type=click.Path(), default=".", help="Directory to copy template into (default: current)")
 def template_use(name, target_dir):
     """Copy a template into the current (or given) directory and create agent.lock."""
+    import shutil
+
     root = _get_templates_dir()
     template_path = os.path.join(root, name)
     if not os.path.isdir(template_path):
@@ -517,15 +624,15 @@ def template_use(name, target_dir):
         click.echo(click.style(f"Template '{name}' has no manifest.json.", fg="red"))
         sys.exit(1)
     try:
-        with open(manifest_path) as f:
-            manifest = json.load(f)
-    except (json.JSONDecodeError, OSError) as e:
+        with open(manifest_path, "rb") as f:
+            manifest = _json.loads(f.read())
+    except (_json.JSONDecodeError, OSError) as e:
         click.echo(click.style(f"Invalid manifest: {e}", fg="red"))
         sys.exit(1)
 
     creds_list = manifest.get("credentials", [])
     personality = manifest.get("personality", {})
-    creds = {c: f"placeholder_{c.lower()}" for c in creds_list}
+    creds = {c: _PLACEHOLDER + c.lower() for c in creds_list}
     personality_data = {
         "system_prompt": personality.get("system_prompt", "You are a helpful AI assistant."),
         "tone": personality.get("tone", "professional"),
@@ -548,6 +655,23 @@ def template_use(name, target_dir):
             shutil.copy2(agent_src, agent_dst)
             click.echo(click.style(f"[OK] Created {agent_dst}", fg="green"))
 
+    # Supporting files (README, requirements, assets) come along too, but never
+    # replace anything already in the target directory
+    copied: List[str] = []
+    for directory, subdirs, files in os.walk(template_path):
+        subdirs[:] = [d for d in subdirs if d != "__pycache__"]
+        dst_dir = os.path.normpath(os.path.join(target_dir, os.path.relpath(directory, template_path)))
+        os.makedirs(dst_dir, exist_ok=True)
+        for filename in files:
+            if directory == template_path and filename in ("manifest.json", "agent.py"):
+                continue
+            dst = os.path.join(dst_dir, filename)
+            if not os.path.exists(dst):
+                shutil.copy2(os.path.join(directory, filename), dst)
+                copied.append(os.path.relpath(dst, target_dir))
+    if copied:
+        click.echo(click.style(f"[OK] Copied {', '.join(sorted(copied))}", fg="green"))
+
     click.echo(click.style("\nNext steps:", fg="cyan", bold=True))
     for c in creds_list:
         click.echo(f"  backpack key add {c}")
@@ -604,38 +728,47 @@ def config_personality(system_prompt, tone):
 @click.option("--fast", is_flag=True, help="Skip pauses (for scripting)")
 def demo(fast):
     """Show a short before/after demo of Backpack's value."""
-    click.echo(click.style("\n  +============================================================+", fg="cyan"))
-    click.echo(click.style("  |  BACKPACK DEMO: Before vs After                            |", fg="cyan"))
-    click.echo(click.style("  +============================================================+\n", fg="cyan"))
-    click.echo(click.style("  BEFORE (Naked Agent):", fg="red", bold=True))
-    click.echo("    - Agent code + scattered .env / dashboard secrets")
-    click.echo("    - 'TWITTER_API_KEY not set' -> crash -> find key -> paste -> restart")
-    click.echo("    - Personality in code or random config files")
-    click.echo("")
-    click.echo(click.style("  AFTER (Backpack):", fg="green", bold=True))
-    click.echo("    - agent.lock travels with code (encrypted credentials + personality)")
-    click.echo("    - Run: backpack run agent.py")
-    click.echo("    - Prompt: 'This agent needs TWITTER_API_KEY. You have it. Allow? (Y/n)' -> Y")
-    click.echo("    - Key injected into process only; never plain text on disk")
-    click.echo("    - Personality versioned in Git with the agent")
-    click.echo("")
-    click.echo(click.style("  JIT INJECTION:", fg="cyan", bold=True))
-    click.echo("    1. Backpack reads agent.lock -> sees required keys")
-    click.echo("    2. Checks your OS keychain (vault)")
-    click.echo("    3. Asks once per key -> injects into env for this run only")
-    click.echo("    4. Agent runs with credentials + AGENT_SYSTEM_PROMPT, AGENT_TONE")
-    click.echo("")
-    click.echo(click.style("  Try it:", fg="yellow", bold=True))
-    click.echo("    backpack quickstart    # 2-minute setup")
-    click.echo("    backpack template list # ready-made agents")
-    click.echo("    backpack run agent.py  # run with JIT injection")
-    click.echo("")
+    # Emit the whole banner with one write instead of one per line
+    lines = [
+        click.style("\n  +============================================================+", fg="cyan"),
+        click.style("  |  BACKPACK DEMO: Before vs After                            |", fg="cyan"),
+        click.style("  +============================================================+\n", fg="cyan"),
+        click.style("  BEFORE (Naked Agent):", fg="red", bold=True),
+        "    - Agent code + scattered .env / dashboard secrets",
+        "    - 'TWITTER_API_KEY not set' -> crash -> find key -> paste -> restart",
+        "    - Personality in code or random config files",
+        "",
+        click.style("  AFTER (Backpack):", fg="green", bold=True),
+        "    - agent.lock travels with code (encrypted credentials + personality)",
+        "    - Run: backpack run agent.py",
+        "    - Prompt: 'This agent needs TWITTER_API_KEY. You have it. Allow? (Y/n)' -> Y",
+        "    - Key injected into process only; never plain text on disk",
+        "    - Personality versioned in Git with the agent",
+        "",
+        click.style("  JIT INJECTION:", fg="cyan", bold=True),
+        "    1. Backpack reads agent.lock -> sees required keys",
+        "    2. Checks your OS keychain (vault)",
+        "    3. Asks once per key -> injects into env for this run only",
+        "    4. Agent runs with credentials + AGENT_SYSTEM_PROMPT, AGENT_TONE",
+        "",
+        click.style("  Try it:", fg="yellow", bold=True),
+        "    backpack quickstart    # 2-minute setup",
+        "    backpack template list # ready-made agents",
+        "    backpack run agent.py  # run with JIT injection",
+        "",
+    ]
+    click.echo("\n".join(lines))
+
+
+_ZIP_BUFFER_SIZE = 1 << 20
 
 
 @cli.command()
 @click.argument("output_file", required=False)
 def export(output_file):
     """Export the current agent to a zip file."""
+    import zipfile
+
     if not output_file:
         output_file = "backpack_agent.zip"
     
@@ -646,7 +779,10 @@ def export(output_file):
     found_files = []
     
     try:
-        with zipfile.ZipFile(output_file, "w") as zf:
+        # One large buffer so zipfile's many small header/data writes become a few syscalls
+        with open(output_file, "wb", buffering=_ZIP_BUFFER_SIZE) as raw, zipfile.ZipFile(
+            raw, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6
+        ) as zf:
             for f in files_to_export:
                 if os.path.exists(f):
                     zf.write(f)
@@ -671,18 +807,26 @@ def export(output_file):
 @click.option("--dir", "target_dir", default=".", help="Target directory")
 def import_agent(input_file, target_dir):
     """Import an agent from a zip file."""
-    if not os.path.exists(input_file):
+    import zipfile
+
+    try:
+        raw = open(input_file, "rb", buffering=_ZIP_BUFFER_SIZE)
+    except FileNotFoundError:
         click.echo(click.style(f"File {input_file} not found.", fg="red"))
         sys.exit(1)
-        
+    except OSError as e:
+        click.echo(click.style(f"Import failed: {e}", fg="red"))
+        sys.exit(1)
+
     try:
-        os.makedirs(target_dir, exist_ok=True)
-        with zipfile.ZipFile(input_file, "r") as zf:
-            zf.extractall(target_dir)
-            click.echo(click.style(f"[OK] Imported agent to {target_dir}", fg="green"))
+        with raw, zipfile.ZipFile(raw, "r") as zf:
+            os.makedirs(target_dir, exist_ok=True)
+            # Extract entry by entry so each file is reported as soon as it lands
             click.echo("Files:")
-            for name in zf.namelist():
-                click.echo(f"  - {name}")
+            for info in zf.infolist():
+                zf.extract(info, target_dir)
+                click.echo(f"  - {info.filename}")
+            click.echo(click.style(f"[OK] Imported agent to {target_dir}", fg="green"))
     except zipfile.BadZipFile:
         click.echo(click.style("Invalid zip file.", fg="red"))
         sys.exit(1)
@@ -702,29 +846,38 @@ def tutorial():
         return
 
     # Step 1: Concepts
-    click.echo(click.style("\n1. The Problem: The Naked Agent 😱", fg="yellow", bold=True))
-    click.echo("Agents usually have their keys scattered in .env files and config hardcoded.")
-    click.echo("This makes them hard to share and insecure.")
+    # Each section is written in one go, then the tutorial waits for the user
+    click.echo("\n".join([
+        click.style("\n1. The Problem: The Naked Agent 😱", fg="yellow", bold=True),
+        "Agents usually have their keys scattered in .env files and config hardcoded.",
+        "This makes them hard to share and insecure.",
+    ]))
     click.pause(info="Press any key to continue...")
 
     # Step 2: Agent Lock
-    click.echo(click.style("\n2. The Solution: agent.lock 🔒", fg="yellow", bold=True))
-    click.echo("Backpack creates an encrypted file that travels with your code.")
-    click.echo("It contains: Credentials (placeholders), Personality, and Memory.")
+    click.echo("\n".join([
+        click.style("\n2. The Solution: agent.lock 🔒", fg="yellow", bold=True),
+        "Backpack creates an encrypted file that travels with your code.",
+        "It contains: Credentials (placeholders), Personality, and Memory.",
+    ]))
     click.pause(info="Press any key to continue...")
 
     # Step 3: JIT Injection
-    click.echo(click.style("\n3. JIT Variable Injection 💉", fg="yellow", bold=True))
-    click.echo("When you run an agent, Backpack:")
-    click.echo("  a. Reads agent.lock")
-    click.echo("  b. Asks for permission to use keys from your secure vault")
-    click.echo("  c. Injects them directly into the process memory")
-    click.echo("  d. NEVER writes them to disk in plain text")
+    click.echo("\n".join([
+        click.style("\n3. JIT Variable Injection 💉", fg="yellow", bold=True),
+        "When you run an agent, Backpack:",
+        "  a. Reads agent.lock",
+        "  b. Asks for permission to use keys from your secure vault",
+        "  c. Injects them directly into the process memory",
+        "  d. NEVER writes them to disk in plain text",
+    ]))
     click.pause(info="Press any key to continue...")
 
     # Step 4: Hands on
-    click.echo(click.style("\n4. Let's try it! 🚀", fg="yellow", bold=True))
-    click.echo("We'll create a dummy agent now.")
+    click.echo("\n".join([
+        click.style("\n4. Let's try it! 🚀", fg="yellow", bold=True),
+        "We'll create a dummy agent now.",
+    ]))
     
     if click.confirm("Create 'tutorial_agent' directory?"):
         target_dir = "tutorial_agent"
@@ -738,14 +891,15 @@ def tutorial():
                  agent_lock.create({"OPENAI_API_KEY": "placeholder"}, {"system_prompt": "You are a student."})
             click.echo(click.style("[OK] Created agent.lock", fg="green"))
             
-            click.echo("\nNow you would run: backpack run agent.py")
-            click.echo("And Backpack would ask to inject OPENAI_API_KEY.")
+            click.echo("\nNow you would run: backpack run agent.py\nAnd Backpack would ask to inject OPENAI_API_KEY.")
         except Exception as e:
              click.echo(click.style(f"Failed to create tutorial agent: {e}", fg="red"))
         
-    click.echo(click.style("\n🎉 Tutorial Complete!", fg="green", bold=True))
-    click.echo("You are ready to use Backpack.")
-    click.echo("Run 'backpack quickstart' to build your real agent.")
+    click.echo("\n".join([
+        click.style("\n🎉 Tutorial Complete!", fg="green", bold=True),
+        "You are ready to use Backpack.",
+        "Run 'backpack quickstart' to build your real agent.",
+    ]))
 
 
 @cli.command()
@@ -753,9 +907,11 @@ def tutorial():
 def status(json_output):
     """Show current agent status."""
     agent_lock = AgentLock()
-    if not os.path.exists(agent_lock.file_path):
+    try:
+        st = os.stat(agent_lock.file_path)
+    except OSError:
         if json_output:
-            click.echo(json.dumps({"error": "No agent.lock found"}))
+            click.echo(_json.dumps({"error": "No agent.lock found"}))
         else:
             click.echo(click.style("No agent.lock found in current directory.", fg="yellow"))
         return
@@ -764,7 +920,7 @@ def status(json_output):
         data = agent_lock.read()
         if not data:
             if json_output:
-                click.echo(json.dumps({"error": "agent.lock is corrupted or unreadable"}))
+                click.echo(_json.dumps({"error": "agent.lock is corrupted or unreadable"}))
             else:
                 click.echo(click.style("agent.lock is corrupted or unreadable.", fg="red"))
             return
@@ -773,38 +929,38 @@ def status(json_output):
             # Return pure data for machine consumption
             output = {
                 "file_path": agent_lock.file_path,
-                "size": os.stat(agent_lock.file_path).st_size,
+                "size": st.st_size,
                 "layers": {
                     "credentials": list(data.get("credentials", {}).keys()),
                     "personality": data.get("personality", {}),
                     "memory": data.get("memory", {})
                 }
             }
-            click.echo(json.dumps(output, indent=2))
+            click.echo(_json.dumps(output, indent=True))
             return
 
-        click.echo(click.style(f"Agent Status ({agent_lock.file_path})", fg="cyan", bold=True))
-        
+        lines = [click.style(f"Agent Status ({agent_lock.file_path})", fg="cyan", bold=True)]
+
         # File info
-        stat = os.stat(agent_lock.file_path)
-        click.echo(f"  Size: {stat.st_size} bytes")
-        
+        lines.append(f"  Size: {st.st_size} bytes")
+
         # Layers
-        click.echo("\n  Layers:")
+        lines.append("\n  Layers:")
         creds = data.get("credentials", {})
-        click.echo(f"    - Credentials: {len(creds)} keys defined")
-        for k in creds:
-            click.echo(f"      - {k}")
-            
+        lines.append(f"    - Credentials: {len(creds)} keys defined")
+        lines.extend(f"      - {k}" for k in creds)
+
         personality = data.get("personality", {})
-        click.echo(f"    - Personality: {len(personality)} items")
-        
+        lines.append(f"    - Personality: {len(personality)} items")
+
         memory = data.get("memory", {})
-        click.echo(f"    - Memory: {len(memory)} items")
+        lines.append(f"    - Memory: {len(memory)} items")
+
+        click.echo("\n".join(lines))
         
     except Exception as e:
         if json_output:
-            click.echo(json.dumps({"error": str(e)}))
+            click.echo(_json.dumps({"error": str(e)}))
         else:
             click.echo(click.style(f"Error reading status: {e}", fg="red"))
 
@@ -812,6 +968,8 @@ def status(json_output):
 @cli.command()
 def info():
     """Show system information."""
+    import platform
+
     click.echo(click.style("Backpack Information", fg="cyan", bold=True))
     click.echo(f"  Version: {__version__}")
     click.echo(f"  Python: {platform.python_version()} ({sys.executable})")
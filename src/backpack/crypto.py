@@ -2,21 +2,25 @@
 Cryptographic utilities for encrypting and decrypting agent data.
 
 This module provides functions for deriving encryption keys from passwords
-using PBKDF2 and encrypting/decrypting data using Fernet symmetric encryption.
+using PBKDF2 and encrypting/decrypting data with AES-256-GCM. Envelopes written
+by earlier versions with Fernet are still decrypted.
 
 Logging in this module is intentionally minimal and NEVER includes any
 secret material such as passwords, salts, or ciphertext. Only operation
 types and high-level status are logged.
+
+The ``cryptography`` package (and hashlib) is imported inside the functions
+that use it so that importing this module (and therefore the CLI) stays cheap
+for commands that never encrypt or decrypt anything.
 """
 
 import base64
 import logging
 import os
-from typing import Optional, Tuple
-
-from cryptography.fernet import Fernet, InvalidToken
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from .exceptions import (
     DecryptionError,
@@ -28,23 +32,180 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Envelope format written by this module:
+#   1 - Fernet token, base64-encoded a second time (no "v" field)
+#   2 - Fernet token stored as-is
+#   3 - AES-256-GCM ciphertext with its nonce; the current format
+# Older versions are still decrypted so existing files keep opening.
+ENVELOPE_VERSION = 3
+_AEAD_NONCE_SIZE = 12
+_AEAD_ASSOCIATED_DATA = b"backpack.v3"
+
+# PBKDF2 iteration count for new keys. Envelopes record the count they were
+# derived with ("iter"); envelopes without it used this value.
+DEFAULT_ITERATIONS = 100000
+# Upper bound on any iteration count, including one read from an envelope, so
+# a tampered "iter" cannot make a single derivation run for hours.
+MAX_ITERATIONS = 10000000
+# Generated secrets (not typed by a person) need no key stretching; fast=True
+# derives with a single iteration for passwords at least this long.
+FAST_ITERATIONS = 1
+FAST_MIN_PASSWORD_LENGTH = 32
+_calibrated: Dict[float, int] = {}
+
+# decrypt_many() derives keys for this many distinct salts or more on a thread
+# pool. PBKDF2 runs in native code without the GIL, so threads use every core;
+# below this count the executor costs more than it saves.
+_PARALLEL_KDF_MIN_SALTS = 4
+
+# Keys derived for a caller-supplied salt, most recently used last. Entries are
+# keyed by a BLAKE2b digest of the password under a per-process random key, so
+# the password itself is never held here.
+_KEY_CACHE_SIZE = 32
+_key_cache: "OrderedDict[Tuple[bytes, bytes, int], bytes]" = OrderedDict()
+_key_cache_lock = threading.Lock()
+_KEY_CACHE_SECRET = os.urandom(32)
+
+# AES-GCM cipher objects by key, most recently used last, so repeated
+# encrypt_with_key()/decrypt_with_key() calls skip the key schedule. They hold
+# the same key material as _key_cache and are cleared with it.
+_AEAD_CACHE_SIZE = 8
+_aead_cache: "OrderedDict[bytes, Any]" = OrderedDict()
+
+
+def _key_cache_id(password: str, salt: bytes, iterations: int) -> Tuple[bytes, bytes, int]:
+    import hashlib
+
+    digest = hashlib.blake2b(password.encode(), digest_size=32, key=_KEY_CACHE_SECRET).digest()
+    return digest, salt, iterations
+
+
+def clear_key_cache() -> None:
+    """Forget every key held by derive_key's in-process cache, and the ciphers built from them."""
+    with _key_cache_lock:
+        _key_cache.clear()
+        _aead_cache.clear()
+
+
+def calibrate_iterations(target_ms: float = 250.0) -> int:
+    """
+    Return the PBKDF2 iteration count that takes about target_ms on this machine.
+
+    One probe derivation is timed and scaled linearly (PBKDF2 cost is linear in
+    the iteration count). The result is clamped to DEFAULT_ITERATIONS..MAX_ITERATIONS
+    and cached per process for each target.
+
+    Args:
+        target_ms: Wall-clock budget for one key derivation, in milliseconds
 
-def derive_key(password: str, salt: Optional[bytes] = None) -> Tuple[bytes, bytes]:
+    Returns:
+        The iteration count to pass to derive_key() / encrypt_data()
+    """
+    if target_ms <= 0:
+        raise ValidationError("Invalid calibration target", "target_ms must be positive")
+
+    iterations = _calibrated.get(target_ms)
+    if iterations is None:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+        probe = 20000
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=b"\0" * 16, iterations=probe)
+        start = time.perf_counter_ns()
+        kdf.derive(b"calibration")
+        elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+        iterations = int(probe * target_ms / max(elapsed_ms, 1e-3)) // 1000 * 1000
+        iterations = min(max(DEFAULT_ITERATIONS, iterations), MAX_ITERATIONS)
+        _calibrated[target_ms] = iterations
+    return iterations
+
+
+def kdf_iterations(encrypted_dict: dict) -> int:
+    """
+    Return the PBKDF2 iteration count recorded in a dictionary produced by encrypt_data().
+
+    Args:
+        encrypted_dict: A dictionary containing 'data' and 'salt', and optionally 'iter'
+
+    Returns:
+        The iteration count, DEFAULT_ITERATIONS if none is recorded
+
+    Raises:
+        ValidationError: If encrypted_dict is invalid or records an invalid count
+    """
+    _validate_encrypted_dict(encrypted_dict)
+    return _kdf_iterations(encrypted_dict)
+
+
+def _kdf_iterations(encrypted_dict: dict) -> int:
+    """kdf_iterations() for a dictionary that has already been validated."""
+    iterations: int = encrypted_dict.get("iter", DEFAULT_ITERATIONS)
+    _validate_iterations(iterations)
+    return iterations
+
+
+def _validate_iterations(iterations: int) -> None:
+    """Raise ValidationError unless iterations is an int from 1 to MAX_ITERATIONS."""
+    if type(iterations) is not int or not 1 <= iterations <= MAX_ITERATIONS:
+        raise ValidationError(
+            "Invalid iteration count",
+            f"Expected an integer from 1 to {MAX_ITERATIONS}, got: {iterations!r}",
+        )
+
+
+def _fast_iterations(password: str) -> int:
+    """Return FAST_ITERATIONS, refusing passwords too short to be generated secrets."""
+    if isinstance(password, str) and len(password) < FAST_MIN_PASSWORD_LENGTH:
+        raise InvalidPasswordError(
+            f"fast=True needs a generated secret of at least {FAST_MIN_PASSWORD_LENGTH} characters"
+        )
+    return FAST_ITERATIONS
+
+
+def derive_key(
+    password: str, salt: Optional[bytes] = None, iterations: int = DEFAULT_ITERATIONS, fast: bool = False
+) -> Tuple[bytes, bytes]:
     """
     Derive an encryption key from a password using PBKDF2.
 
+    Keys for a caller-supplied salt are kept in a small in-process LRU cache, so
+    deriving again with the same password, salt and iteration count skips PBKDF2.
+
     Args:
         password: The password to derive the key from
         salt: Optional salt bytes. If None, a random salt is generated.
+        iterations: PBKDF2 iteration count (see calibrate_iterations())
+        fast: The password is a generated high-entropy secret, so derive with
+            FAST_ITERATIONS instead of iterations. Envelopes must then record
+            FAST_ITERATIONS (encrypt_data(fast=True) does this).
 
     Returns:
-        A tuple of (key, salt) where key is a base64-encoded Fernet key
+        A tuple of (key, salt) where key is the URL-safe base64 encoding of 32 key bytes
         and salt is the salt bytes used (or generated).
 
     Raises:
-        InvalidPasswordError: If password is empty or None
+        InvalidPasswordError: If password is empty or None, or too short for fast=True
         KeyDerivationError: If key derivation fails
     """
+    _validate_password(password)
+
+    if fast:
+        iterations = _fast_iterations(password)
+
+    _validate_iterations(iterations)
+
+    # A freshly generated salt can never be looked up again, so only keys for
+    # caller-supplied salts are cached
+    if salt is None:
+        salt = os.urandom(16)
+        return _derive_key_unchecked(password, salt, iterations, cache=False), salt
+
+    _validate_salt(salt)
+    return _derive_key_unchecked(password, salt, iterations), salt
+
+
+def _validate_password(password: str) -> None:
+    """Raise unless password is a non-empty string."""
     if not password:
         raise InvalidPasswordError("Password cannot be empty or None")
 
@@ -54,114 +215,403 @@ def derive_key(password: str, salt: Optional[bytes] = None) -> Tuple[bytes, byte
             f"Got type: {type(password).__name__}",
         )
 
+
+def _validate_salt(salt: bytes) -> None:
+    """Raise ValidationError unless salt is at least 8 bytes."""
+    if not isinstance(salt, bytes) or len(salt) < 8:
+        raise ValidationError(
+            "Invalid salt",
+            "Salt must be at least 8 bytes",
+        )
+
+
+def _derive_key_unchecked(password: str, salt: bytes, iterations: int, cache: bool = True) -> bytes:
+    """
+    Run (or look up) PBKDF2 for arguments derive_key() has already validated.
+
+    Batch callers validate the password once and then call this per salt.
+    """
     try:
-        if salt is None:
-            salt = os.urandom(16)
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
-        if not isinstance(salt, bytes) or len(salt) < 8:
-            raise ValidationError(
-                "Invalid salt",
-                "Salt must be at least 8 bytes",
-            )
+        cache_id = None
+        if cache:
+            cache_id = _key_cache_id(password, salt, iterations)
+            with _key_cache_lock:
+                cached = _key_cache.get(cache_id)
+                if cached is not None:
+                    _key_cache.move_to_end(cache_id)
+                    return cached
 
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
             salt=salt,
-            iterations=100000,
+            iterations=iterations,
         )
         key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-        logger.debug("Derived encryption key using PBKDF2", extra={"salt_len": len(salt)})
-        return key, salt
+        logger.debug("Derived encryption key using PBKDF2", extra={"salt_len": len(salt), "iterations": iterations})
+
+        if cache_id is not None:
+            with _key_cache_lock:
+                _key_cache[cache_id] = key
+                if len(_key_cache) > _KEY_CACHE_SIZE:
+                    _key_cache.popitem(last=False)
+        return key
     except Exception as e:
-        if isinstance(e, (InvalidPasswordError, ValidationError)):
-            raise
         raise KeyDerivationError("Failed to derive encryption key", str(e)) from e
 
 
-def encrypt_data(data: str, password: str) -> dict:
+def _validate_plaintext(data: Union[str, bytes]) -> None:
+    """Raise ValidationError unless data is a string (or UTF-8 bytes) that can be encrypted."""
+    if data is None:
+        raise ValidationError("Data cannot be None", "Provide a valid string to encrypt")
+
+    if not isinstance(data, (str, bytes)):
+        raise ValidationError("Data must be a string", f"Got type: {type(data).__name__}")
+
+
+def _validate_encrypted_dict(encrypted_dict: dict) -> None:
+    """Raise ValidationError unless encrypted_dict has the shape produced by encrypt_data()."""
+    if not isinstance(encrypted_dict, dict):
+        raise ValidationError(
+            "Encrypted data must be a dictionary",
+            f"Got type: {type(encrypted_dict).__name__}",
+        )
+
+    if "data" not in encrypted_dict or "salt" not in encrypted_dict:
+        raise ValidationError(
+            "Encrypted dictionary missing required keys",
+            "Expected keys: 'data' and 'salt'",
+        )
+
+
+def _aead(key: bytes) -> Any:
+    """Return an AES-256-GCM cipher for a key from derive_key(), reusing a cached one."""
+    with _key_cache_lock:
+        aead = _aead_cache.get(key)
+        if aead is not None:
+            _aead_cache.move_to_end(key)
+            return aead
+
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    aead = AESGCM(base64.urlsafe_b64decode(key))
+    with _key_cache_lock:
+        _aead_cache[key] = aead
+        if len(_aead_cache) > _AEAD_CACHE_SIZE:
+            _aead_cache.popitem(last=False)
+    return aead
+
+
+def _seal(
+    aead: Any, data: Union[str, bytes], encoded_salt: str, iterations: int, nonce: Optional[bytes] = None
+) -> dict:
+    """Encrypt one validated payload into a current-version envelope (with a fresh nonce unless given)."""
+    if nonce is None:
+        nonce = os.urandom(_AEAD_NONCE_SIZE)
+    ciphertext = aead.encrypt(nonce, data if isinstance(data, bytes) else data.encode(), _AEAD_ASSOCIATED_DATA)
+    return {
+        "v": ENVELOPE_VERSION,
+        "nonce": base64.b64encode(nonce).decode(),
+        "data": base64.b64encode(ciphertext).decode(),
+        "salt": encoded_salt,
+        "iter": iterations,
+    }
+
+
+def encrypt_with_key(
+    data: Union[str, bytes], key: bytes, salt: bytes, iterations: int = DEFAULT_ITERATIONS
+) -> dict:
     """
-    Encrypt a string using PBKDF2 key derivation and Fernet encryption.
+    Encrypt a string with a key previously returned by derive_key().
+
+    This lets callers that encrypt several values under the same password pay
+    for PBKDF2 once instead of once per value.
+
+    Args:
+        data: The plaintext string to encrypt. UTF-8 bytes (e.g. from orjson.dumps)
+            are encrypted as-is, skipping the str round trip.
+        key: The base64-encoded key from derive_key()
+        salt: The salt the key was derived with; stored alongside the ciphertext
+        iterations: The iteration count the key was derived with; stored as well
+
+    Returns:
+        A dictionary in the same format as encrypt_data()
+
+    Raises:
+        ValidationError: If data is not a string/bytes or is None
+        EncryptionError: If encryption fails
+    """
+    _validate_plaintext(data)
+
+    try:
+        envelope = _seal(_aead(key), data, base64.b64encode(salt).decode(), iterations)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Encrypted data string", extra={"cipher_len": len(envelope["data"])})
+        return envelope
+    except Exception as e:
+        raise EncryptionError("Failed to encrypt data", str(e)) from e
+
+
+def encrypt_many(
+    payloads: Iterable[Union[str, bytes]], key: bytes, salt: bytes, iterations: int = DEFAULT_ITERATIONS
+) -> List[dict]:
+    """
+    Encrypt several values with one key, reusing a single cipher instance.
+
+    Each value still gets its own random IV, so equal payloads produce
+    different ciphertexts.
 
     Args:
-        data: The plaintext string to encrypt
+        payloads: The plaintext strings (or UTF-8 bytes) to encrypt
+        key: The base64-encoded key from derive_key()
+        salt: The salt the key was derived with; stored alongside each ciphertext
+        iterations: The iteration count the key was derived with; stored as well
+
+    Returns:
+        A list of dictionaries in the same format as encrypt_data(), in payload order
+
+    Raises:
+        ValidationError: If any payload is not a string/bytes or is None
+        EncryptionError: If encryption fails
+    """
+    payloads = list(payloads)
+    for data in payloads:
+        _validate_plaintext(data)
+
+    try:
+        aead = _aead(key)
+        encoded_salt = base64.b64encode(salt).decode()
+        # One getrandom() call for the whole batch, sliced into per-value nonces
+        nonces = os.urandom(_AEAD_NONCE_SIZE * len(payloads))
+        return [
+            _seal(aead, data, encoded_salt, iterations, nonces[i * _AEAD_NONCE_SIZE : (i + 1) * _AEAD_NONCE_SIZE])
+            for i, data in enumerate(payloads)
+        ]
+    except Exception as e:
+        raise EncryptionError("Failed to encrypt data", str(e)) from e
+
+
+def encrypt_data(
+    data: Union[str, bytes], password: str, iterations: int = DEFAULT_ITERATIONS, fast: bool = False
+) -> dict:
+    """
+    Encrypt a string using PBKDF2 key derivation and AES-256-GCM.
+
+    Args:
+        data: The plaintext string (or UTF-8 bytes) to encrypt
         password: The password to use for key derivation
+        iterations: PBKDF2 iteration count (see calibrate_iterations())
+        fast: The password is a generated secret of at least FAST_MIN_PASSWORD_LENGTH
+            characters; derive with FAST_ITERATIONS. Decryption needs no flag,
+            since the count is stored in the envelope.
 
     Returns:
         A dictionary containing:
-        - 'data': Base64-encoded encrypted data
+        - 'v': Envelope format version (ENVELOPE_VERSION)
+        - 'nonce': Base64-encoded 12-byte GCM nonce
+        - 'data': Base64-encoded ciphertext with its authentication tag
         - 'salt': Base64-encoded salt used for key derivation
+        - 'iter': PBKDF2 iteration count used for key derivation
 
     Raises:
-        ValidationError: If data is not a string or is None
+        ValidationError: If data is not a string/bytes or is None
         EncryptionError: If encryption fails
     """
-    if data is None:
-        raise ValidationError("Data cannot be None", "Provide a valid string to encrypt")
-
-    if not isinstance(data, str):
-        raise ValidationError("Data must be a string", f"Got type: {type(data).__name__}")
+    _validate_plaintext(data)
 
     try:
-        key, salt = derive_key(password)
-        f = Fernet(key)
-        encrypted = f.encrypt(data.encode())
-        logger.debug("Encrypted data string", extra={"cipher_len": len(encrypted)})
-        return {
-            "data": base64.b64encode(encrypted).decode(),
-            "salt": base64.b64encode(salt).decode(),
-        }
+        if fast:
+            iterations = _fast_iterations(password)
+        key, salt = derive_key(password, iterations=iterations)
     except (InvalidPasswordError, KeyDerivationError, ValidationError):
         raise
     except Exception as e:
         raise EncryptionError("Failed to encrypt data", str(e)) from e
+    return encrypt_with_key(data, key, salt, iterations)
 
 
-def decrypt_data(encrypted_dict: dict, password: str) -> str:
+def decode_salt(encrypted_dict: dict) -> bytes:
     """
-    Decrypt data that was encrypted with encrypt_data().
+    Return the raw salt stored in a dictionary produced by encrypt_data().
 
     Args:
-        encrypted_dict: A dictionary containing:
-            - 'data': Base64-encoded encrypted data
-            - 'salt': Base64-encoded salt used for key derivation
-        password: The password used for encryption
+        encrypted_dict: A dictionary containing 'data' and 'salt'
 
     Returns:
-        The decrypted plaintext string
+        The salt bytes, suitable for passing to derive_key()
 
     Raises:
         ValidationError: If encrypted_dict is invalid or missing required keys
-        DecryptionError: If decryption fails (wrong password, corrupted data, etc.)
+        DecryptionError: If the salt is not valid base64
     """
-    if not isinstance(encrypted_dict, dict):
-        raise ValidationError(
-            "Encrypted data must be a dictionary",
-            f"Got type: {type(encrypted_dict).__name__}",
-        )
+    _validate_encrypted_dict(encrypted_dict)
+    return _decode_salt(encrypted_dict)
 
-    if "data" not in encrypted_dict or "salt" not in encrypted_dict:
-        raise ValidationError(
-            "Encrypted dictionary missing required keys",
-            "Expected keys: 'data' and 'salt'",
+
+def _decode_salt(encrypted_dict: dict) -> bytes:
+    """decode_salt() for a dictionary that has already been validated."""
+    try:
+        return base64.b64decode(encrypted_dict["salt"])
+    except ValueError as e:
+        raise DecryptionError("Decryption failed - invalid data format", str(e)) from e
+    except Exception as e:
+        raise DecryptionError("Decryption failed", str(e)) from e
+
+
+class _Ciphers:
+    """The ciphers for one key, each built the first time an envelope needs it."""
+
+    __slots__ = ("key", "_aead", "_fernet")
+
+    def __init__(self, key: bytes):
+        self.key = key
+        self._aead: Any = None
+        self._fernet: Any = None
+
+    def aead(self) -> Any:
+        if self._aead is None:
+            self._aead = _aead(self.key)
+        return self._aead
+
+    def fernet(self) -> Any:
+        if self._fernet is None:
+            from cryptography.fernet import Fernet
+
+            self._fernet = Fernet(self.key)
+        return self._fernet
+
+
+def _decrypt_token(ciphers: _Ciphers, encrypted_dict: dict) -> str:
+    """Decrypt one validated envelope of any supported version."""
+    from cryptography.exceptions import InvalidTag
+    from cryptography.fernet import InvalidToken
+
+    version = encrypted_dict.get("v", 1)
+    if version not in (1, 2, ENVELOPE_VERSION):
+        raise DecryptionError(
+            "Decryption failed - unsupported format",
+            f"Envelope version {version!r} is newer than this version of backpack supports",
         )
 
     try:
-        salt = base64.b64decode(encrypted_dict["salt"])
-        key, _ = derive_key(password, salt)
-        f = Fernet(key)
-        encrypted_data = base64.b64decode(encrypted_dict["data"])
-        decrypted = f.decrypt(encrypted_data)
+        decrypted: bytes
+        if version == ENVELOPE_VERSION:
+            decrypted = ciphers.aead().decrypt(
+                base64.b64decode(encrypted_dict["nonce"]),
+                base64.b64decode(encrypted_dict["data"]),
+                _AEAD_ASSOCIATED_DATA,
+            )
+        elif version == 2:
+            decrypted = ciphers.fernet().decrypt(encrypted_dict["data"].encode("ascii"))
+        else:
+            decrypted = ciphers.fernet().decrypt(base64.b64decode(encrypted_dict["data"]))
         return decrypted.decode("utf-8")
-    except InvalidToken:
+    except (InvalidTag, InvalidToken):
         raise DecryptionError(
             "Decryption failed - invalid token",
             "The password may be incorrect or the data may be corrupted",
         ) from None
     except (UnicodeDecodeError, ValueError) as e:
         raise DecryptionError("Decryption failed - invalid data format", str(e)) from e
-    except (InvalidPasswordError, KeyDerivationError, ValidationError):
-        raise
     except Exception as e:
         raise DecryptionError("Decryption failed", str(e)) from e
 
+
+def decrypt_with_key(encrypted_dict: dict, key: bytes) -> str:
+    """
+    Decrypt data produced by encrypt_data() with an already-derived key.
+
+    Args:
+        encrypted_dict: A dictionary containing 'data' and 'salt'
+        key: The key derived from the password and decode_salt(encrypted_dict)
+
+    Returns:
+        The decrypted plaintext string
+
+    Raises:
+        ValidationError: If encrypted_dict is invalid or missing required keys
+        DecryptionError: If decryption fails (wrong key, corrupted data, etc.)
+    """
+    _validate_encrypted_dict(encrypted_dict)
+    return _decrypt_token(_Ciphers(key), encrypted_dict)
+
+
+def decrypt_many(encrypted_dicts: Iterable[dict], password: str) -> List[str]:
+    """
+    Decrypt several values encrypted with the same password.
+
+    The key is derived once per distinct salt and one cipher instance is shared
+    by every value with that salt, so a batch written by encrypt_many() costs a
+    single PBKDF2 run. When there are several distinct salts, their keys are
+    derived in parallel on a thread pool.
+
+    Args:
+        encrypted_dicts: Dictionaries produced by encrypt_data() or encrypt_many()
+        password: The password used for encryption
+
+    Returns:
+        The decrypted plaintext strings, in input order
+
+    Raises:
+        ValidationError: If any dictionary is invalid or missing required keys
+        DecryptionError: If any value fails to decrypt
+    """
+    encrypted_dicts = list(encrypted_dicts)
+    for encrypted_dict in encrypted_dicts:
+        _validate_encrypted_dict(encrypted_dict)
+
+    # Key derivation parameters per envelope, then the distinct ones to derive
+    params = [(encrypted_dict["salt"], _kdf_iterations(encrypted_dict)) for encrypted_dict in encrypted_dicts]
+    pending: Dict[Tuple[str, int], bytes] = {}
+    for param, encrypted_dict in zip(params, encrypted_dicts):
+        if param not in pending:
+            pending[param] = _decode_salt(encrypted_dict)
+            _validate_salt(pending[param])
+    if pending:
+        _validate_password(password)
+
+    def derive(param: Tuple[str, int]) -> bytes:
+        return _derive_key_unchecked(password, pending[param], param[1])
+
+    workers = min(len(pending), os.cpu_count() or 1)
+    if len(pending) >= _PARALLEL_KDF_MIN_SALTS and workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            keys = list(executor.map(derive, pending))
+    else:
+        keys = [derive(param) for param in pending]
+    ciphers_by_param = {param: _Ciphers(key) for param, key in zip(pending, keys)}
+
+    return [
+        _decrypt_token(ciphers_by_param[param], encrypted_dict)
+        for param, encrypted_dict in zip(params, encrypted_dicts)
+    ]
+
+
+def decrypt_data(encrypted_dict: dict, password: str) -> str:
+    """
+    Decrypt data that was encrypted with encrypt_data().
+
+    Args:
+        encrypted_dict: A dictionary containing:
+            - 'data': The ciphertext (a Fernet token in version 1 and 2 envelopes)
+            - 'salt': Base64-encoded salt used for key derivation
+            - 'nonce': The GCM nonce (version 3 only)
+            - 'iter': Optional PBKDF2 iteration count; absent means DEFAULT_ITERATIONS
+            - 'v': Optional envelope version; absent means version 1
+        password: The password used for encryption
+
+    Returns:
+        The decrypted plaintext string
+
+    Raises:
+        ValidationError: If encrypted_dict is invalid or missing required keys
+        DecryptionError: If decryption fails (wrong password, corrupted data, etc.)
+    """
+    salt = decode_salt(encrypted_dict)
+    key, _ = derive_key(password, salt, kdf_iterations(encrypted_dict))
+    return decrypt_with_key(encrypted_dict, key)
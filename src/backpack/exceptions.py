@@ -163,6 +163,18 @@ class AgentLockWriteError(AgentLockError):
         self.file_path = file_path
 
 
+class AgentLockExistsError(AgentLockWriteError):
+    """Exception raised when creating agent.lock without overwrite and the file already exists."""
+
+    def __init__(self, file_path: str = "agent.lock"):
+        AgentLockError.__init__(
+            self,
+            f"Agent lock file already exists: {file_path}",
+            "Pass overwrite=True to replace it",
+        )
+        self.file_path = file_path
+
+
 class ValidationError(BackpackError):
     """Exception raised for input validation errors."""
 
@@ -8,26 +8,84 @@ Logging in this module NEVER records secret key values. Only key names and
 high-level operation results are logged.
 """
 
-import json
+import functools
 import logging
-from typing import Dict, Optional, cast
-
-import keyring
-import keyring.errors
+import threading
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, Optional, Type, TypeVar, cast
 
+from . import _json
 from .audit import AuditLogger
 from .exceptions import (
+    BackpackError,
     InvalidKeyNameError,
     KeychainAccessError,
     KeychainDeletionError,
+    KeychainError,
     KeychainStorageError,
     ValidationError,
 )
 
+F = TypeVar("F", bound=Callable[..., Any])
+
 SERVICE_NAME = "backpack-agent"
 logger = logging.getLogger(__name__)
 audit_logger = AuditLogger()
 
+# Upper bound on concurrent keychain lookups in get_keys()
+_MAX_FETCH_WORKERS = 8
+
+# The registry is updated by read-modify-write; concurrent updates from threads
+# of one process are serialised so neither overwrites the other's change
+_registry_lock = threading.Lock()
+
+
+def _keyring() -> ModuleType:
+    """
+    Import keyring on first use and return it.
+
+    Importing keyring loads its backend plugins, which dominates start-up for
+    commands that never touch the keychain, so it is not imported at module level.
+    """
+    import keyring
+    import keyring.errors
+
+    return keyring
+
+
+def _keychain_error(err_cls: Type[KeychainError], key_name: str, error: Exception) -> KeychainError:
+    """Build the err_cls raised for a failed keychain operation on key_name."""
+    unexpected = not isinstance(error, _keyring().errors.KeyringError)
+    if err_cls is KeychainAccessError:
+        if unexpected:
+            return KeychainAccessError(f"Unexpected error retrieving key '{key_name}'", str(error))
+        return KeychainAccessError(f"Failed to retrieve key '{key_name}' from keychain", str(error))
+    prefix = "Unexpected error" if unexpected else "Keyring error"
+    return err_cls(key_name, f"{prefix}: {str(error)}")
+
+
+def _wrap_keyring_errors(err_cls: Type[KeychainError]) -> Callable[[F], F]:
+    """
+    Decorate a function taking a key name so that failures raise err_cls.
+
+    Backpack errors (such as an invalid key name) propagate unchanged; keyring
+    errors and anything unexpected are chained into err_cls.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(key_name: str, *args: Any, **kwargs: Any) -> Any:
+            try:
+                return func(key_name, *args, **kwargs)
+            except BackpackError:
+                raise
+            except Exception as e:
+                raise _keychain_error(err_cls, key_name, e) from e
+
+        return cast(F, wrapper)
+
+    return decorator
+
 
 def _validate_key_name(key_name: str) -> None:
     """
@@ -51,6 +109,7 @@ def _validate_key_name(key_name: str) -> None:
         raise InvalidKeyNameError(key_name, "Key names starting with '_' are reserved for internal use")
 
 
+@_wrap_keyring_errors(KeychainStorageError)
 def store_key(key_name: str, key_value: str) -> None:
     """
     Store a key-value pair in the OS keychain.
@@ -71,16 +130,12 @@ def store_key(key_name: str, key_value: str) -> None:
     if not isinstance(key_value, str):
         raise ValidationError("Key value must be a string", f"Got type: {type(key_value).__name__}")
 
-    try:
-        keyring.set_password(SERVICE_NAME, key_name, key_value)
-        logger.info("Stored key in keychain", extra={"service": SERVICE_NAME, "key_name": key_name})
-        audit_logger.log_event("store_key", {"service": SERVICE_NAME, "key_name": key_name})
-    except keyring.errors.KeyringError as e:
-        raise KeychainStorageError(key_name, f"Keyring error: {str(e)}") from e
-    except Exception as e:
-        raise KeychainStorageError(key_name, f"Unexpected error: {str(e)}") from e
+    _keyring().set_password(SERVICE_NAME, key_name, key_value)
+    logger.info("Stored key in keychain", extra={"service": SERVICE_NAME, "key_name": key_name})
+    audit_logger.log_event("store_key", {"service": SERVICE_NAME, "key_name": key_name})
 
 
+@_wrap_keyring_errors(KeychainAccessError)
 def get_key(key_name: str) -> Optional[str]:
     """
     Retrieve a key value from the OS keychain.
@@ -97,19 +152,67 @@ def get_key(key_name: str) -> Optional[str]:
     """
     _validate_key_name(key_name)
 
-    try:
-        value = keyring.get_password(SERVICE_NAME, key_name)
-        logger.debug(
-            "Retrieved key from keychain",
-            extra={"service": SERVICE_NAME, "key_name": key_name, "found": bool(value)},
-        )
-        if value:
-            audit_logger.log_event("get_key", {"service": SERVICE_NAME, "key_name": key_name})
+    value: Optional[str] = _keyring().get_password(SERVICE_NAME, key_name)
+    logger.debug(
+        "Retrieved key from keychain",
+        extra={"service": SERVICE_NAME, "key_name": key_name, "found": bool(value)},
+    )
+    if value:
+        audit_logger.log_event("get_key", {"service": SERVICE_NAME, "key_name": key_name})
+    return value
+
+
+def get_keys(key_names: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Retrieve several key values from the OS keychain in one pass.
+
+    keyring has no batch lookup, so each name is still one backend call, but
+    all names are validated up front and the whole lookup is recorded as a
+    single audit event instead of one per key. After the first lookup (which
+    lets keyring initialise its backend once), the remaining calls run on a
+    small thread pool, since each one mostly waits on the OS keychain.
+
+    Args:
+        key_names: The names/identifiers of the keys to retrieve
+
+    Returns:
+        A dictionary mapping each name to its stored value, or None if not found
+
+    Raises:
+        InvalidKeyNameError: If any key name is invalid
+        KeychainAccessError: If accessing the keychain fails
+    """
+    names = list(dict.fromkeys(key_names))
+    for key_name in names:
+        _validate_key_name(key_name)
+
+    keyring = _keyring()
+
+    @_wrap_keyring_errors(KeychainAccessError)
+    def fetch(key_name: str) -> Optional[str]:
+        value: Optional[str] = keyring.get_password(SERVICE_NAME, key_name)
         return value
-    except keyring.errors.KeyringError as e:
-        raise KeychainAccessError(f"Failed to retrieve key '{key_name}' from keychain", str(e)) from e
-    except Exception as e:
-        raise KeychainAccessError(f"Unexpected error retrieving key '{key_name}'", str(e)) from e
+
+    values: Dict[str, Optional[str]] = {}
+    if names:
+        values[names[0]] = fetch(names[0])
+    rest = names[1:]
+    if len(rest) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(_MAX_FETCH_WORKERS, len(rest))) as executor:
+            values.update(zip(rest, executor.map(fetch, rest)))
+    else:
+        values.update((key_name, fetch(key_name)) for key_name in rest)
+
+    found = [key_name for key_name, value in values.items() if value]
+    logger.debug(
+        "Retrieved keys from keychain",
+        extra={"service": SERVICE_NAME, "requested": len(names), "found": len(found)},
+    )
+    if found:
+        audit_logger.log_event("get_keys", {"service": SERVICE_NAME, "key_names": found})
+    return values
 
 
 def list_keys() -> Dict[str, bool]:
@@ -129,8 +232,8 @@ def list_keys() -> Dict[str, bool]:
         registry = get_key("_registry")
         if registry:
             try:
-                return cast(Dict[str, bool], json.loads(registry))
-            except json.JSONDecodeError:
+                return cast(Dict[str, bool], _json.loads(registry))
+            except _json.JSONDecodeError:
                 return {}
         return {}
     except KeychainAccessError:
@@ -151,12 +254,37 @@ def register_key(key_name: str) -> None:
         InvalidKeyNameError: If key_name is invalid
         KeychainStorageError: If storing the registry fails
     """
-    _validate_key_name(key_name)
+    register_keys([key_name])
 
+
+def register_keys(key_names: Iterable[str]) -> None:
+    """
+    Register several key names in the keychain registry at once.
+
+    The registry is read once and written at most once, and the write is
+    skipped entirely when every name is already registered.
+
+    Args:
+        key_names: The names of the keys to register
+
+    Raises:
+        InvalidKeyNameError: If any key name is invalid
+        KeychainStorageError: If storing the registry fails
+    """
+    names = list(dict.fromkeys(key_names))
+    for key_name in names:
+        _validate_key_name(key_name)
+
+    keyring = _keyring()
     try:
-        registry = list_keys()
-        registry[key_name] = True
-        keyring.set_password(SERVICE_NAME, "_registry", json.dumps(registry))
+        with _registry_lock:
+            registry = list_keys()
+            new_names = [name for name in names if name not in registry]
+            if not new_names:
+                return
+            for key_name in new_names:
+                registry[key_name] = True
+            keyring.set_password(SERVICE_NAME, "_registry", _json.dumps(registry))
     except (KeychainAccessError, KeychainStorageError):
         # Registry failures are non-critical (key itself is already stored)
         pass
@@ -164,6 +292,7 @@ def register_key(key_name: str) -> None:
         raise KeychainStorageError("_registry", f"Failed to update registry: {str(e)}") from e
 
 
+@_wrap_keyring_errors(KeychainDeletionError)
 def delete_key(key_name: str) -> None:
     """
     Delete a key from the keychain and registry.
@@ -180,20 +309,18 @@ def delete_key(key_name: str) -> None:
     # Deletion is intentionally idempotent:
     # - If the secret doesn't exist in the keychain, we still remove it from the registry.
     # - Tests expect delete_key() to not raise for missing keys.
+    keyring = _keyring()
     try:
         keyring.delete_password(SERVICE_NAME, key_name)
         audit_logger.log_event("delete_key", {"service": SERVICE_NAME, "key_name": key_name})
     except keyring.errors.PasswordDeleteError:
         pass
-    except keyring.errors.KeyringError as e:
-        raise KeychainDeletionError(key_name, f"Keyring error: {str(e)}") from e
-    except Exception as e:
-        raise KeychainDeletionError(key_name, f"Unexpected error: {str(e)}") from e
 
-    # Update registry
+    # Update registry, skipping the write when the name was never registered
     try:
-        registry = list_keys()
-        registry.pop(key_name, None)
-        keyring.set_password(SERVICE_NAME, "_registry", json.dumps(registry))
+        with _registry_lock:
+            registry = list_keys()
+            if registry.pop(key_name, None) is not None:
+                keyring.set_password(SERVICE_NAME, "_registry", _json.dumps(registry))
     except Exception:
         pass
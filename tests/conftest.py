@@ -8,6 +8,7 @@ import sys
 import tempfile
 
 import pytest
+from click.testing import CliRunner
 
 # Add src directory to Python path so tests can import backpack without
 # installation. This allows tests to run without needing: pip install -e .
@@ -16,6 +17,59 @@ if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _fast_pbkdf2():
+    """Run PBKDF2 with a single iteration when BACKPACK_TEST_FAST_KDF=1.
+
+    Keys are still derived (and envelopes still record the requested count),
+    so round trips and error handling are exercised; only the hash loop is
+    skipped. Off by default so the suite checks real key derivation; tests
+    that time PBKDF2 itself request real_pbkdf2 to opt out.
+    """
+    if os.environ.get("BACKPACK_TEST_FAST_KDF") != "1":
+        yield
+        return
+
+    from cryptography.hazmat.primitives.kdf import pbkdf2
+
+    real_pbkdf2 = pbkdf2.PBKDF2HMAC
+
+    def fast_pbkdf2(**kwargs):
+        kwargs["iterations"] = 1
+        return real_pbkdf2(**kwargs)
+
+    fast_pbkdf2.__wrapped__ = real_pbkdf2
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(pbkdf2, "PBKDF2HMAC", fast_pbkdf2)
+        yield
+
+
+@pytest.fixture
+def real_pbkdf2(monkeypatch):
+    """Undo the BACKPACK_TEST_FAST_KDF shortcut for one test."""
+    from cryptography.hazmat.primitives.kdf import pbkdf2
+
+    monkeypatch.setattr(pbkdf2, "PBKDF2HMAC", getattr(pbkdf2.PBKDF2HMAC, "__wrapped__", pbkdf2.PBKDF2HMAC))
+
+
+@pytest.fixture(autouse=True)
+def _slow_tests_use_real_pbkdf2(request):
+    """Keep the full PBKDF2 work factor for tests marked slow."""
+    if request.node.get_closest_marker("slow"):
+        request.getfixturevalue("real_pbkdf2")
+
+
+@pytest.fixture(scope="session")
+def runner():
+    """Return a CliRunner shared by the CLI tests.
+
+    CliRunner holds no per-invocation state; tests needing a scratch working
+    directory also request in_temp_dir.
+    """
+    return CliRunner()
+
+
 @pytest.fixture
 def temp_dir():
     """Create a temporary directory for test files."""
@@ -24,6 +78,32 @@ def temp_dir():
     shutil.rmtree(temp_path)
 
 
+@pytest.fixture
+def in_temp_dir(tmp_path, monkeypatch):
+    """Run the test with a fresh temporary directory as the working directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def broken_templates_dir(tmp_path_factory):
+    """Return a read-only templates directory whose "tpl" template has an unparsable manifest."""
+    templates = tmp_path_factory.mktemp("templates")
+    (templates / "tpl").mkdir()
+    (templates / "tpl" / "manifest.json").write_text("invalid json")
+    return templates
+
+
+@pytest.fixture
+def fast_kdf(monkeypatch):
+    """Have new agent.lock files use a low PBKDF2 iteration count.
+
+    For tests that exercise CLI plumbing rather than key strength: files are
+    still really encrypted, and reads use the count recorded in each layer.
+    """
+    monkeypatch.setattr("backpack.agent_lock.DEFAULT_ITERATIONS", 1000)
+
+
 @pytest.fixture
 def test_agent_lock_path(temp_dir):
     """Return a path to a test agent.lock file in a temp directory."""
@@ -4,11 +4,14 @@ Tests for agent_lock module - agent lock file management.
 
 import json
 import os
+import stat
 from unittest.mock import patch
 
 import pytest
 
 from backpack.agent_lock import AgentLock
+from backpack.crypto import MAX_ITERATIONS, decrypt_with_key, derive_key, encrypt_data
+from backpack.exceptions import AgentLockExistsError, AgentLockNotFoundError, AgentLockWriteError, ValidationError
 
 
 @pytest.fixture(autouse=True)
@@ -119,6 +122,64 @@ class TestAgentLockCreate:
         assert first_result["personality"] != second_result["personality"]
         assert second_result["personality"]["system_prompt"] == "Different prompt"
 
+    def test_create_without_overwrite(self, test_agent_lock_path, test_master_key,
+                                      sample_credentials, sample_personality):
+        """Test overwrite=False creates a new file but refuses to replace one."""
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        agent_lock.create(sample_credentials, sample_personality, overwrite=False)
+        with open(test_agent_lock_path) as f:
+            original = f.read()
+
+        with pytest.raises(AgentLockExistsError):
+            agent_lock.create({}, {"system_prompt": "Other", "tone": "casual"}, overwrite=False)
+
+        with open(test_agent_lock_path) as f:
+            assert f.read() == original
+        assert os.listdir(os.path.dirname(test_agent_lock_path)) == [os.path.basename(test_agent_lock_path)]
+
+    def test_create_without_overwrite_no_hard_links(self, test_agent_lock_path, test_master_key,
+                                                    sample_credentials, sample_personality):
+        """Test filesystems without hard links fall back to check-then-rename."""
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        with patch("os.link", side_effect=PermissionError("Operation not permitted")):
+            agent_lock.create(sample_credentials, sample_personality, overwrite=False)
+            with pytest.raises(AgentLockExistsError):
+                agent_lock.create(sample_credentials, sample_personality, overwrite=False)
+
+        assert agent_lock.read()["credentials"] == sample_credentials
+        assert os.listdir(os.path.dirname(test_agent_lock_path)) == [os.path.basename(test_agent_lock_path)]
+
+
+class TestAgentLockAtomicWrite:
+    """Tests for replacing agent.lock atomically."""
+
+    def test_failed_write_keeps_original(self, temp_dir, test_agent_lock_path, test_master_key,
+                                         sample_credentials, sample_personality):
+        """Test that a failure before the rename leaves the old file and no temp files."""
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        agent_lock.create(sample_credentials, sample_personality)
+        with open(test_agent_lock_path) as f:
+            before = f.read()
+
+        with patch("os.replace", side_effect=OSError("Disk full")):
+            with pytest.raises(AgentLockWriteError):
+                agent_lock.create({}, sample_personality)
+
+        with open(test_agent_lock_path) as f:
+            assert f.read() == before
+        assert os.listdir(temp_dir) == ["agent.lock"]
+
+    def test_rewrite_preserves_file_mode(self, test_agent_lock_path, test_master_key,
+                                         sample_credentials, sample_personality):
+        """Test that rewriting keeps the permissions of the existing file."""
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        agent_lock.create(sample_credentials, sample_personality)
+        os.chmod(test_agent_lock_path, 0o640)
+
+        agent_lock.update_memory({"turn": 1})
+
+        assert stat.S_IMODE(os.stat(test_agent_lock_path).st_mode) == 0o640
+
 
 class TestAgentLockRead:
     """Tests for reading agent.lock files."""
@@ -177,6 +238,43 @@ class TestAgentLockRead:
         result = agent_lock.read()
         assert result is None
 
+    def test_read_stats_file_once(self, test_agent_lock_path, test_master_key,
+                                  sample_credentials, sample_personality):
+        """Test that a read checks the path and keys the cache with a single stat."""
+        AgentLock(test_agent_lock_path, master_key=test_master_key).create(
+            sample_credentials, sample_personality
+        )
+
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        with patch("backpack.agent_lock.os.stat", wraps=os.stat) as mock_stat:
+            assert agent_lock.read() is not None
+        assert mock_stat.call_count == 1
+
+    def test_read_rejects_non_object_without_parsing(self, test_agent_lock_path, test_master_key):
+        """Test that files not starting with a JSON object are rejected before parsing."""
+        with open(test_agent_lock_path, 'w') as f:
+            f.write("[" + "0," * 100000 + "0]")
+
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+
+        with patch("backpack.agent_lock._json.loads") as mock_loads:
+            assert agent_lock.read() is None
+        mock_loads.assert_not_called()
+
+    def test_read_with_bom_and_whitespace(self, test_agent_lock_path, test_master_key,
+                                          sample_credentials, sample_personality):
+        """Test that a UTF-8 BOM and leading whitespace pass the probe."""
+        AgentLock(test_agent_lock_path, master_key=test_master_key).create(
+            sample_credentials, sample_personality
+        )
+        with open(test_agent_lock_path, 'rb') as f:
+            content = f.read()
+        with open(test_agent_lock_path, 'wb') as f:
+            f.write(b"\xef\xbb\xbf\n  " + content)
+
+        data = AgentLock(test_agent_lock_path, master_key=test_master_key).read()
+        assert data["personality"] == sample_personality
+
 
 class TestAgentLockUpdateMemory:
     """Tests for updating memory layer."""
@@ -220,6 +318,57 @@ class TestAgentLockUpdateMemory:
         assert updated["personality"] == original["personality"]
         assert updated["memory"] == new_memory
 
+    def test_update_memory_reencrypts_only_memory(self, test_agent_lock_path, test_master_key,
+                                                  sample_credentials, sample_personality):
+        """Test that the other layers keep their ciphertext across a memory update."""
+        AgentLock(test_agent_lock_path, master_key=test_master_key).create(sample_credentials, sample_personality)
+        with open(test_agent_lock_path) as f:
+            before = json.load(f)["layers"]
+
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        agent_lock.update_memory({"turn": 1})
+
+        with open(test_agent_lock_path) as f:
+            after = json.load(f)["layers"]
+        assert after["credentials"] == before["credentials"]
+        assert after["personality"] == before["personality"]
+        assert after["memory"] != before["memory"]
+        assert AgentLock(test_agent_lock_path, master_key=test_master_key).read()["memory"] == {"turn": 1}
+
+    def test_update_memory_wrong_master_key(self, test_agent_lock_path, test_master_key,
+                                            sample_credentials, sample_personality):
+        """Test that a wrong master key is rejected before anything is written."""
+        AgentLock(test_agent_lock_path, master_key=test_master_key).create(sample_credentials, sample_personality)
+        with open(test_agent_lock_path) as f:
+            before = f.read()
+
+        with pytest.raises(AgentLockNotFoundError):
+            AgentLock(test_agent_lock_path, master_key="wrong-key").update_memory({"turn": 1})
+
+        with open(test_agent_lock_path) as f:
+            assert f.read() == before
+
+    def test_update_memory_unchanged_skips_write(self, test_agent_lock_path, test_master_key,
+                                                 sample_credentials, sample_personality):
+        """Test that saving the same memory again does not rewrite the file."""
+        writer = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        writer.create(sample_credentials, sample_personality, {"turn": 1})
+
+        fresh = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        with patch.object(AgentLock, "_write_layers") as mock_write:
+            # Once from a fresh instance (no cache) and once from the writer (cached)
+            fresh.update_memory({"turn": 1})
+            writer.update_memory({"turn": 1})
+        mock_write.assert_not_called()
+
+        writer.update_memory({"turn": 2})
+        assert fresh.read_memory() == {"turn": 2}
+
+    def test_update_memory_nonexistent(self, test_agent_lock_path, test_master_key):
+        """Test that updating a missing file raises AgentLockNotFoundError."""
+        with pytest.raises(AgentLockNotFoundError):
+            AgentLock(test_agent_lock_path, master_key=test_master_key).update_memory({})
+
 
 class TestAgentLockGetRequiredKeys:
     """Tests for getting required keys."""
@@ -257,9 +406,76 @@ class TestAgentLockGetRequiredKeys:
         agent_lock.master_key = test_master_key
         
         required_keys = agent_lock.get_required_keys()
-        
+
         assert required_keys == []
 
+    def test_get_required_keys_decrypts_only_credentials(self, test_agent_lock_path, test_master_key,
+                                                         sample_credentials, sample_personality):
+        """Test that only the credentials layer is decrypted."""
+        AgentLock(test_agent_lock_path, master_key=test_master_key).create(
+            sample_credentials, sample_personality
+        )
+
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        with patch("backpack.agent_lock.decrypt_with_key", wraps=decrypt_with_key) as mock_decrypt:
+            assert sorted(agent_lock.get_required_keys()) == sorted(sample_credentials)
+            assert mock_decrypt.call_count == 1
+
+            # A full read afterwards only decrypts the two remaining layers
+            data = agent_lock.read()
+            assert mock_decrypt.call_count == 3
+
+        assert data["personality"] == sample_personality
+
+
+class TestAgentLockReadSingleLayer:
+    """Tests for reading individual layers."""
+
+    def test_read_personality_and_memory(self, test_agent_lock_path, test_master_key,
+                                         sample_credentials, sample_personality):
+        """Test reading the personality and memory layers on their own."""
+        AgentLock(test_agent_lock_path, master_key=test_master_key).create(
+            sample_credentials, sample_personality, {"turns": 3}
+        )
+
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        with patch("backpack.agent_lock.decrypt_with_key", wraps=decrypt_with_key) as mock_decrypt:
+            assert agent_lock.read_personality() == sample_personality
+            assert mock_decrypt.call_count == 1
+            assert agent_lock.read_memory() == {"turns": 3}
+            assert mock_decrypt.call_count == 2
+
+    def test_read_layer_credentials(self, test_agent_lock_path, test_master_key,
+                                    sample_credentials, sample_personality):
+        """Test reading a layer by name."""
+        AgentLock(test_agent_lock_path, master_key=test_master_key).create(
+            sample_credentials, sample_personality
+        )
+
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        assert agent_lock.read_layer("credentials") == sample_credentials
+
+    def test_read_layer_unknown_name(self, test_agent_lock_path, test_master_key):
+        """Test that an unknown layer name is rejected."""
+        with pytest.raises(ValidationError, match="Unknown layer"):
+            AgentLock(test_agent_lock_path, master_key=test_master_key).read_layer("secrets")
+
+    def test_read_single_layer_nonexistent(self, test_agent_lock_path, test_master_key):
+        """Test reading a single layer when the file doesn't exist."""
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+
+        assert agent_lock.read_personality() is None
+        assert agent_lock.read_memory() is None
+
+    def test_read_single_layer_wrong_master_key(self, test_agent_lock_path, test_master_key,
+                                                sample_credentials, sample_personality):
+        """Test reading a single layer with the wrong master key."""
+        AgentLock(test_agent_lock_path, master_key=test_master_key).create(
+            sample_credentials, sample_personality
+        )
+
+        assert AgentLock(test_agent_lock_path, master_key="wrong-key").read_memory() is None
+
 
 class TestAgentLockIntegration:
     """Integration tests for AgentLock operations."""
@@ -311,3 +527,148 @@ class TestAgentLockIntegration:
         assert result2 is not None
         assert result1["personality"]["system_prompt"] == "Agent 1"
         assert result2["personality"]["system_prompt"] == "Agent 2"
+
+
+class TestAgentLockCache:
+    """Tests for the per-instance decrypted layer cache."""
+
+    def test_repeated_read_decrypts_once(self, test_agent_lock_path, test_master_key,
+                                         sample_credentials, sample_personality):
+        """Test that reading an unchanged file does not decrypt it again."""
+        writer = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        writer.create(sample_credentials, sample_personality)
+
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        with patch("backpack.agent_lock.decrypt_with_key", wraps=decrypt_with_key) as mock_decrypt:
+            first = agent_lock.read()
+            second = agent_lock.read()
+            agent_lock.get_required_keys()
+
+        assert mock_decrypt.call_count == 3
+        assert first == second
+        assert first is not second
+
+    def test_create_primes_cache(self, test_agent_lock_path, test_master_key,
+                                 sample_credentials, sample_personality):
+        """Test that a freshly written file can be read back without decrypting."""
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        agent_lock.create(sample_credentials, sample_personality)
+
+        with patch("backpack.agent_lock.decrypt_with_key") as mock_decrypt:
+            result = agent_lock.read()
+
+        mock_decrypt.assert_not_called()
+        assert result["credentials"] == sample_credentials
+
+    def test_cache_returns_independent_copies(self, test_agent_lock_path, test_master_key,
+                                              sample_credentials, sample_personality):
+        """Test that mutating a read result does not leak into later reads."""
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        agent_lock.create(sample_credentials, sample_personality)
+
+        agent_lock.read()["credentials"]["INJECTED"] = "value"
+
+        assert agent_lock.read()["credentials"] == sample_credentials
+
+    def test_cache_invalidated_by_external_write(self, test_agent_lock_path, test_master_key,
+                                                 sample_credentials, sample_personality):
+        """Test that a rewrite by another instance is picked up."""
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        agent_lock.create(sample_credentials, sample_personality)
+        agent_lock.read()
+
+        other = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        other.create({"OTHER_KEY": "placeholder_other_key"}, sample_personality)
+
+        assert agent_lock.get_required_keys() == ["OTHER_KEY"]
+
+    def test_cache_invalidated_by_master_key_change(self, test_agent_lock_path, test_master_key,
+                                                    sample_credentials, sample_personality):
+        """Test that cached plaintext is not served under a different master key."""
+        agent_lock = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        agent_lock.create(sample_credentials, sample_personality)
+
+        agent_lock.master_key = "wrong-key"
+
+        assert agent_lock.read() is None
+
+
+class TestAgentLockKeyDerivation:
+    """Tests for deriving the master key once per instance."""
+
+    def test_layers_share_one_derivation(self, test_agent_lock_path, test_master_key,
+                                         sample_credentials, sample_personality, sample_memory):
+        """Test that create() and read() each derive the key only once."""
+        writer = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        with patch("backpack.agent_lock.derive_key", wraps=derive_key) as mock_derive:
+            writer.create(sample_credentials, sample_personality, sample_memory)
+        assert mock_derive.call_count == 1
+
+        reader = AgentLock(test_agent_lock_path, master_key=test_master_key)
+        with patch("backpack.agent_lock.derive_key", wraps=derive_key) as mock_derive:
+            assert reader.read()["memory"] == sample_memory
+            reader.update_memory({"turn": 2})
+            reader.update_personality({"system_prompt": "Updated", "tone": "casual"})
+        assert mock_derive.call_count == 1
+
+        assert AgentLock(test_agent_lock_path, master_key=test_master_key).read()["memory"] == {"turn": 2}
+
+    def test_read_legacy_per_layer_salts(self, test_agent_lock_path, test_master_key,
+                                         sample_credentials, sample_personality, sample_memory):
+        """Test that files whose layers were encrypted with separate salts still read."""
+        legacy = {
+            "version": "1.0",
+            "layers": {
+                "credentials": encrypt_data(json.dumps(sample_credentials), test_master_key),
+                "personality": encrypt_data(json.dumps(sample_personality), test_master_key),
+                "memory": encrypt_data(json.dumps(sample_memory), test_master_key),
+            },
+        }
+        with open(test_agent_lock_path, "w") as f:
+            json.dump(legacy, f)
+
+        result = AgentLock(test_agent_lock_path, master_key=test_master_key).read()
+
+        assert result == {
+            "credentials": sample_credentials,
+            "personality": sample_personality,
+            "memory": sample_memory,
+        }
+
+    def test_update_keeps_file_iteration_count(self, test_agent_lock_path, test_master_key,
+                                               sample_credentials, sample_personality, sample_memory):
+        """Test that rewriting a layer keeps the PBKDF2 iteration count the file was created with."""
+        layers = {
+            name: encrypt_data(json.dumps(value), test_master_key, iterations=2000)
+            for name, value in (
+                ("credentials", sample_credentials),
+                ("personality", sample_personality),
+                ("memory", sample_memory),
+            )
+        }
+        with open(test_agent_lock_path, "w") as f:
+            json.dump({"version": "1.0", "layers": layers}, f)
+
+        AgentLock(test_agent_lock_path, master_key=test_master_key).update_memory({"turn": 2})
+
+        with open(test_agent_lock_path) as f:
+            memory = json.load(f)["layers"]["memory"]
+        assert memory["iter"] == 2000
+        assert AgentLock(test_agent_lock_path, master_key=test_master_key).read_memory() == {"turn": 2}
+
+    def test_read_rejects_oversized_iteration_count(self, test_agent_lock_path, test_master_key,
+                                                    sample_credentials, sample_personality, sample_memory):
+        """Test that a tampered "iter" above MAX_ITERATIONS fails the read without running PBKDF2."""
+        AgentLock(test_agent_lock_path, master_key=test_master_key).create(
+            sample_credentials, sample_personality, sample_memory
+        )
+        with open(test_agent_lock_path) as f:
+            envelope = json.load(f)
+        for layer in envelope["layers"].values():
+            layer["iter"] = MAX_ITERATIONS + 1
+        with open(test_agent_lock_path, "w") as f:
+            json.dump(envelope, f)
+
+        with patch("cryptography.hazmat.primitives.kdf.pbkdf2.PBKDF2HMAC") as mock_kdf:
+            assert AgentLock(test_agent_lock_path, master_key=test_master_key).read() is None
+        mock_kdf.assert_not_called()
@@ -1,4 +1,6 @@
 
+import os
+import stat
 from unittest.mock import mock_open, patch
 
 import pytest
@@ -6,12 +8,16 @@ import pytest
 from backpack.agent_lock import AgentLock
 from backpack.crypto import EncryptionError
 from backpack.exceptions import (
+    AgentLockNotFoundError,
     AgentLockReadError,
     AgentLockWriteError,
     InvalidPathError,
     ValidationError,
 )
 
+REGULAR_FILE = os.stat_result((stat.S_IFREG | 0o600, 1, 0, 1, 0, 0, 64, 0, 0, 0))
+DIRECTORY = os.stat_result((stat.S_IFDIR | 0o700, 1, 0, 1, 0, 0, 64, 0, 0, 0))
+
 
 class TestAgentLockCoverage:
     def setup_method(self):
@@ -29,99 +35,90 @@ class TestAgentLockCoverage:
         with pytest.raises(ValidationError, match="Memory must be a dictionary"):
             self.lock.create({}, {}, "not a dict")
 
-    @patch('backpack.agent_lock.encrypt_data')
+    @patch('backpack.agent_lock.encrypt_many')
     def test_create_encryption_error(self, mock_encrypt):
         mock_encrypt.side_effect = EncryptionError("Encryption failed")
         with pytest.raises(AgentLockWriteError, match="Failed to encrypt data"):
             self.lock.create({}, {}, {})
 
-    @patch('builtins.open', side_effect=PermissionError("Access denied"))
+    @patch('tempfile.mkstemp', side_effect=PermissionError("Access denied"))
     @patch('os.path.exists', return_value=True)
     def test_create_permission_error(self, mock_exists, mock_open):
         with pytest.raises(AgentLockWriteError, match="Permission denied"):
             self.lock.create({}, {}, {})
 
-    @patch('builtins.open', side_effect=OSError("Disk full"))
+    @patch('tempfile.mkstemp', side_effect=OSError("Disk full"))
     @patch('os.path.exists', return_value=True)
     def test_create_os_error(self, mock_exists, mock_open):
         with pytest.raises(AgentLockWriteError, match="OS error"):
             self.lock.create({}, {}, {})
 
-    @patch('builtins.open', side_effect=Exception("Unknown error"))
+    @patch('tempfile.mkstemp', side_effect=Exception("Unknown error"))
     @patch('os.path.exists', return_value=True)
     def test_create_unexpected_error(self, mock_exists, mock_open):
         with pytest.raises(AgentLockWriteError, match="Unexpected error"):
             self.lock.create({}, {}, {})
 
-    @patch('os.path.exists', return_value=True)
-    @patch('os.path.isfile', return_value=False)
-    def test_read_invalid_path_error(self, mock_isfile, mock_exists):
+    @patch('os.stat', return_value=DIRECTORY)
+    def test_read_invalid_path_error(self, mock_stat):
         with pytest.raises(InvalidPathError, match="Path exists but is not a file"):
             self.lock.read()
 
-    @patch('os.path.exists', return_value=True)
-    @patch('os.path.isfile', return_value=True)
+    @patch('os.stat', return_value=REGULAR_FILE)
     @patch('builtins.open', side_effect=PermissionError("Access denied"))
-    def test_read_permission_error(self, mock_open, mock_isfile, mock_exists):
+    def test_read_permission_error(self, mock_open, mock_stat):
         with pytest.raises(AgentLockReadError, match="Permission denied"):
             self.lock.read()
 
-    @patch('os.path.exists', return_value=True)
-    @patch('os.path.isfile', return_value=True)
+    @patch('os.stat', return_value=REGULAR_FILE)
     @patch('builtins.open', side_effect=OSError("Disk read error"))
-    def test_read_os_error(self, mock_open, mock_isfile, mock_exists):
+    def test_read_os_error(self, mock_open, mock_stat):
         with pytest.raises(AgentLockReadError, match="OS error"):
             self.lock.read()
 
-    @patch('os.path.exists', return_value=True)
-    @patch('os.path.isfile', return_value=True)
+    @patch('os.stat', return_value=REGULAR_FILE)
     @patch('builtins.open', side_effect=Exception("Unknown error"))
-    def test_read_unexpected_error(self, mock_open, mock_isfile, mock_exists):
+    def test_read_unexpected_error(self, mock_open, mock_stat):
         with pytest.raises(AgentLockReadError, match="Unexpected error reading file"):
             self.lock.read()
 
-    @patch('os.path.exists', return_value=True)
-    @patch('os.path.isfile', return_value=True)
-    @patch('builtins.open', new_callable=mock_open, read_data='["not a dict"]')
-    def test_read_invalid_structure_list(self, mock_file, mock_isfile, mock_exists):
+    @patch('os.stat', return_value=REGULAR_FILE)
+    @patch('builtins.open', new_callable=mock_open, read_data=b'["not a dict"]')
+    def test_read_invalid_structure_list(self, mock_file, mock_stat):
         assert self.lock.read() is None
 
-    @patch('os.path.exists', return_value=True)
-    @patch('os.path.isfile', return_value=True)
-    @patch('builtins.open', new_callable=mock_open, read_data='{"no_layers": {}}')
-    def test_read_missing_layers(self, mock_file, mock_isfile, mock_exists):
+    @patch('os.stat', return_value=REGULAR_FILE)
+    @patch('builtins.open', new_callable=mock_open, read_data=b'{"no_layers": {}}')
+    def test_read_missing_layers(self, mock_file, mock_stat):
         assert self.lock.read() is None
 
-    @patch('os.path.exists', return_value=True)
-    @patch('os.path.isfile', return_value=True)
-    @patch('builtins.open', new_callable=mock_open, read_data='{"layers": {"credentials": "x", "personality": "y"}}')
-    def test_read_missing_required_layer(self, mock_file, mock_isfile, mock_exists):
+    @patch('os.stat', return_value=REGULAR_FILE)
+    @patch('builtins.open', new_callable=mock_open, read_data=b'{"layers": {"credentials": "x", "personality": "y"}}')
+    def test_read_missing_required_layer(self, mock_file, mock_stat):
         assert self.lock.read() is None
 
-    @patch('os.path.exists', return_value=True)
-    @patch('os.path.isfile', return_value=True)
+    @patch('os.stat', return_value=REGULAR_FILE)
     @patch(
         'builtins.open',
         new_callable=mock_open,
-        read_data='{"layers": {"credentials": "x", "personality": "y", "memory": "z"}}',
+        read_data=b'{"layers": {"credentials": "x", "personality": "y", "memory": "z"}}',
     )
-    @patch('backpack.agent_lock.decrypt_data')
+    @patch('backpack.agent_lock.AgentLock._decrypt_layer')
     def test_read_decrypted_content_not_json(
-        self, mock_decrypt, mock_file, mock_isfile, mock_exists
+        self, mock_decrypt, mock_file, mock_stat
     ):
         mock_decrypt.return_value = "not json"
         assert self.lock.read() is None
 
-    @patch('os.path.exists', return_value=True)
-    @patch('os.path.isfile', return_value=True)
+    @patch('os.stat', return_value=REGULAR_FILE)
     @patch(
         'builtins.open',
         new_callable=mock_open,
-        read_data='{"layers": {"credentials": "x", "personality": "y", "memory": "z"}}',
+        read_data=b'{"layers": {"credentials": "x", "personality": "y", "memory": "z"}}',
     )
-    @patch('backpack.agent_lock.decrypt_data')
+    @patch('backpack.agent_lock.AgentLock._decrypt_layer')
     def test_read_unexpected_error_during_decryption(
-        self, mock_decrypt, mock_file, mock_isfile, mock_exists
+        self, mock_decrypt, mock_file, mock_stat
     ):
         mock_decrypt.side_effect = Exception("Unexpected")
         assert self.lock.read() is None
@@ -130,21 +127,26 @@ class TestAgentLockCoverage:
         with pytest.raises(ValidationError, match="Memory must be a dictionary"):
             self.lock.update_memory("not a dict")
 
-    @patch('backpack.agent_lock.AgentLock.read', return_value={"credentials": {}, "personality": {}, "memory": {}})
-    @patch('backpack.agent_lock.AgentLock.create')
-    def test_update_memory_write_error(self, mock_create, mock_read):
-        mock_create.side_effect = AgentLockWriteError("test", "Failed")
+    @patch('backpack.agent_lock.AgentLock._update_layer')
+    def test_update_memory_write_error(self, mock_update):
+        mock_update.side_effect = AgentLockWriteError("test", "Failed")
         with pytest.raises(AgentLockWriteError):
             self.lock.update_memory({})
 
-    @patch('backpack.agent_lock.AgentLock.read', return_value={"credentials": {}, "personality": {}, "memory": {}})
-    @patch('backpack.agent_lock.AgentLock.create')
-    def test_update_memory_unexpected_error(self, mock_create, mock_read):
-        mock_create.side_effect = Exception("Unexpected")
+    @patch('backpack.agent_lock.AgentLock._update_layer')
+    def test_update_memory_unexpected_error(self, mock_update):
+        mock_update.side_effect = Exception("Unexpected")
         with pytest.raises(AgentLockWriteError, match="Failed to update memory"):
             self.lock.update_memory({})
 
-    @patch('backpack.agent_lock.AgentLock.read')
+    @patch('backpack.agent_lock.AgentLock._write_layers')
+    @patch('os.stat', side_effect=FileNotFoundError("missing"))
+    def test_update_memory_missing_file(self, mock_stat, mock_write):
+        with pytest.raises(AgentLockNotFoundError):
+            self.lock.update_memory({})
+        mock_write.assert_not_called()
+
+    @patch('backpack.agent_lock.AgentLock.read_layer')
     def test_get_required_keys_credentials_not_dict(self, mock_read):
-        mock_read.return_value = {"credentials": "not a dict"}
+        mock_read.return_value = "not a dict"
         assert self.lock.get_required_keys() == []
@@ -1,12 +1,13 @@
 
+import itertools
 import json
 import os
-import time
 from unittest.mock import patch
 
 import pytest
 
 from backpack.audit import AuditLogger
+from backpack.crypto import MAX_ITERATIONS, derive_key
 
 
 class TestAuditLogger:
@@ -29,10 +30,10 @@ class TestAuditLogger:
             assert "salt" in encrypted_data
 
     def test_read_logs(self, audit_logger):
-        # Log a few events
-        audit_logger.log_event("event1", {"id": 1})
-        time.sleep(0.01) # Ensure timestamp difference
-        audit_logger.log_event("event2", {"id": 2})
+        # Log a few events; a counting clock gives them distinct timestamps
+        with patch("backpack.audit.time.time", side_effect=itertools.count(1.0).__next__):
+            audit_logger.log_event("event1", {"id": 1})
+            audit_logger.log_event("event2", {"id": 2})
         
         logs = audit_logger.read_logs()
         assert len(logs) == 2
@@ -69,6 +70,20 @@ class TestAuditLogger:
         assert logs[0]["event_type"] == "valid_1"
         assert logs[1]["event_type"] == "valid_2"
 
+    def test_oversized_iteration_count_skipped(self, audit_logger):
+        """Test that a line recording an iteration count above MAX_ITERATIONS is skipped unread."""
+        audit_logger.log_event("valid", {})
+        with open(audit_logger.file_path) as f:
+            tampered = json.loads(f.readline())
+        tampered["iter"] = MAX_ITERATIONS + 1
+        with open(audit_logger.file_path, "a") as f:
+            f.write(json.dumps(tampered) + "\n")
+
+        with patch("backpack.audit.derive_key", wraps=derive_key) as mock_derive:
+            logs = audit_logger.read_logs()
+        assert [entry["event_type"] for entry in logs] == ["valid"]
+        assert mock_derive.call_count == 1
+
     def test_clear_logs(self, audit_logger):
         audit_logger.log_event("test", {})
         assert os.path.exists(audit_logger.file_path)
@@ -86,3 +101,26 @@ class TestAuditLogger:
             # Should not raise
             audit_logger.log_event("test", {})
 
+    def test_key_derived_once_per_logger(self, audit_logger):
+        """Test events share one derived key and salt but get distinct nonces."""
+        with patch("backpack.audit.derive_key", wraps=derive_key) as mock_derive:
+            for i in range(3):
+                audit_logger.log_event("event", {"id": i})
+        assert mock_derive.call_count == 1
+
+        with open(audit_logger.file_path, "r") as f:
+            envelopes = [json.loads(line) for line in f]
+        assert len({envelope["salt"] for envelope in envelopes}) == 1
+        assert len({envelope["nonce"] for envelope in envelopes}) == 3
+        assert [log["details"]["id"] for log in audit_logger.read_logs()] == [0, 1, 2]
+
+    def test_read_logs_derives_once_per_salt(self, audit_logger):
+        """Test read_logs() derives one key for all lines sharing a salt."""
+        for i in range(3):
+            audit_logger.log_event("event", {"id": i})
+
+        reader = AuditLogger(file_path=audit_logger.file_path)
+        with patch("backpack.audit.derive_key", wraps=derive_key) as mock_derive:
+            logs = reader.read_logs()
+        assert mock_derive.call_count == 1
+        assert [log["details"]["id"] for log in logs] == [0, 1, 2]
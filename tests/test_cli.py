@@ -3,204 +3,160 @@ Tests for CLI module - command-line interface functionality.
 """
 
 import os
+import stat
+from unittest.mock import patch
 
-from click.testing import CliRunner
+import pytest
 
 from backpack.agent_lock import AgentLock
 from backpack.cli import cli
 from backpack.keychain import register_key, store_key
 
 
+@pytest.mark.usefixtures("fast_kdf")
 class TestCLIInit:
     """Tests for init command."""
     
-    def test_init_basic(self, mock_keyring, temp_dir, clean_env):
+    def test_init_basic(self, runner, mock_keyring, in_temp_dir, clean_env):
         """Test basic agent initialization."""
-        runner = CliRunner()
-        original_dir = os.getcwd()
+        result = runner.invoke(cli, [
+            'init',
+            '--credentials', 'OPENAI_API_KEY,TWITTER_TOKEN',
+            '--personality', 'Test agent personality'
+        ])
         
-        try:
-            os.chdir(temp_dir)
-            result = runner.invoke(cli, [
-                'init',
-                '--credentials', 'OPENAI_API_KEY,TWITTER_TOKEN',
-                '--personality', 'Test agent personality'
-            ])
-            
-            assert result.exit_code == 0
-            assert os.path.exists('agent.lock')
-            
-            # Verify agent.lock contents
-            agent_lock = AgentLock()
-            agent_lock.master_key = "default-key"
-            data = agent_lock.read()
-
-            assert data is not None
-            assert "OPENAI_API_KEY" in data["credentials"]
-            assert "TWITTER_TOKEN" in data["credentials"]
-            assert data["personality"]["system_prompt"] == "Test agent personality"
-        finally:
-            os.chdir(original_dir)
+        assert result.exit_code == 0
+        assert os.path.exists('agent.lock')
+        
+        # Verify agent.lock contents
+        agent_lock = AgentLock()
+        agent_lock.master_key = "default-key"
+        data = agent_lock.read()
+
+        assert data is not None
+        assert "OPENAI_API_KEY" in data["credentials"]
+        assert "TWITTER_TOKEN" in data["credentials"]
+        assert data["personality"]["system_prompt"] == "Test agent personality"
     
-    def test_init_no_credentials(self, mock_keyring, temp_dir, clean_env):
+    def test_init_no_credentials(self, runner, mock_keyring, in_temp_dir, clean_env):
         """Test initialization with only personality."""
-        runner = CliRunner()
-        original_dir = os.getcwd()
+        result = runner.invoke(cli, [
+            'init',
+            '--personality', 'Personality only'
+        ])
         
-        try:
-            os.chdir(temp_dir)
-            result = runner.invoke(cli, [
-                'init',
-                '--personality', 'Personality only'
-            ])
-            
-            assert result.exit_code == 0
-            assert os.path.exists('agent.lock')
-            
-            agent_lock = AgentLock()
-            agent_lock.master_key = "default-key"
-            data = agent_lock.read()
-            
-            assert data["credentials"] == {}
-            assert data["personality"]["system_prompt"] == "Personality only"
-        finally:
-            os.chdir(original_dir)
+        assert result.exit_code == 0
+        assert os.path.exists('agent.lock')
+        
+        agent_lock = AgentLock()
+        agent_lock.master_key = "default-key"
+        data = agent_lock.read()
+        
+        assert data["credentials"] == {}
+        assert data["personality"]["system_prompt"] == "Personality only"
     
-    def test_init_no_personality(self, mock_keyring, temp_dir, clean_env):
+    def test_init_no_personality(self, runner, mock_keyring, in_temp_dir, clean_env):
         """Test initialization with only credentials."""
-        runner = CliRunner()
-        original_dir = os.getcwd()
+        result = runner.invoke(cli, [
+            'init',
+            '--credentials', 'OPENAI_API_KEY'
+        ])
         
-        try:
-            os.chdir(temp_dir)
-            result = runner.invoke(cli, [
-                'init',
-                '--credentials', 'OPENAI_API_KEY'
-            ])
-            
-            assert result.exit_code == 0
-            
-            agent_lock = AgentLock()
-            agent_lock.master_key = "default-key"
-            data = agent_lock.read()
-            
-            assert "OPENAI_API_KEY" in data["credentials"]
-            assert data["personality"]["system_prompt"] == "You are a helpful AI assistant."
-        finally:
-            os.chdir(original_dir)
+        assert result.exit_code == 0
+        
+        agent_lock = AgentLock()
+        agent_lock.master_key = "default-key"
+        data = agent_lock.read()
+        
+        assert "OPENAI_API_KEY" in data["credentials"]
+        assert data["personality"]["system_prompt"] == "You are a helpful AI assistant."
 
 
 class TestCLIRun:
     """Tests for run command."""
     
-    def test_run_no_agent_lock(self, temp_dir):
+    def test_run_no_agent_lock(self, runner, in_temp_dir):
         """Test running agent without agent.lock file."""
-        runner = CliRunner()
-        original_dir = os.getcwd()
-        
-        try:
-            os.chdir(temp_dir)
-            # Create dummy script
-            with open("example_agent.py", "w") as f:
-                f.write("print('hello')")
-                
-            result = runner.invoke(cli, ['run', 'example_agent.py'])
+        # Create dummy script
+        with open("example_agent.py", "w") as f:
+            f.write("print('hello')")
             
-            assert result.exit_code != 0
-            assert "No agent.lock found" in result.output
-        finally:
-            os.chdir(original_dir)
+        result = runner.invoke(cli, ['run', 'example_agent.py'])
+        
+        assert result.exit_code != 0
+        assert "No agent.lock found" in result.output
     
-    def test_run_with_missing_keys(self, mock_keyring, temp_dir):
+    def test_run_with_missing_keys(self, runner, mock_keyring, in_temp_dir):
         """Test running agent with missing keys in keychain."""
-        runner = CliRunner()
-        original_dir = os.getcwd()
+        # Create dummy script
+        with open("example_agent.py", "w") as f:
+            f.write("print('hello')")
+
+        # Create agent.lock
+        runner.invoke(cli, [
+            'init',
+            '--credentials', 'MISSING_KEY',
+            '--personality', 'Test'
+        ])
         
-        try:
-            os.chdir(temp_dir)
-            # Create dummy script
-            with open("example_agent.py", "w") as f:
-                f.write("print('hello')")
-
-            # Create agent.lock
-            runner.invoke(cli, [
-                'init',
-                '--credentials', 'MISSING_KEY',
-                '--personality', 'Test'
-            ])
-            
-            # Try to run (should prompt for missing key)
-            result = runner.invoke(cli, ['run', 'example_agent.py'], input='n\n')
+        # Try to run (should prompt for missing key)
+        result = runner.invoke(cli, ['run', 'example_agent.py'], input='n\n')
 
-            # Should indicate key not found
-            assert (
-                "not found in environment, agent.lock, or vault" in result.output
-                or "Access denied" in result.output
-            )
-        finally:
-            os.chdir(original_dir)
+        # Should indicate key not found
+        assert (
+            "not found in environment, agent.lock, or vault" in result.output
+            or "Access denied" in result.output
+        )
     
-    def test_run_with_existing_keys(self, mock_keyring, temp_dir):
+    @pytest.mark.integration
+    def test_run_with_existing_keys(self, runner, mock_keyring, in_temp_dir):
         """Test running agent with keys in keychain."""
-        runner = CliRunner()
-        original_dir = os.getcwd()
+        # Store key
+        store_key("TEST_KEY", "test-value")
+        register_key("TEST_KEY")
         
-        try:
-            os.chdir(temp_dir)
-            # Store key
-            store_key("TEST_KEY", "test-value")
-            register_key("TEST_KEY")
-            
-            # Create agent.lock
-            runner.invoke(cli, [
-                'init',
-                '--credentials', 'TEST_KEY',
-                '--personality', 'Test agent'
-            ])
-            
-            # Create a simple test agent script
-            test_script = os.path.join(temp_dir, "test_agent.py")
-            with open(test_script, 'w') as f:
-                f.write("""
+        # Create agent.lock
+        runner.invoke(cli, [
+            'init',
+            '--credentials', 'TEST_KEY',
+            '--personality', 'Test agent'
+        ])
+        
+        # Create a simple test agent script
+        test_script = "test_agent.py"
+        with open(test_script, 'w') as f:
+            f.write("""
 import os
 import sys
 sys.exit(0 if os.environ.get('TEST_KEY') == 'test-value' else 1)
 """)
-            
-            # Run agent (approve access)
-            result = runner.invoke(cli, ['run', 'test_agent.py'], input='y\n')
-            
-            # Should succeed (exit code 0 from script)
-            assert result.exit_code == 0 or "Running" in result.output
-        finally:
-            os.chdir(original_dir)
+        
+        # Run agent (approve access)
+        result = runner.invoke(cli, ['run', 'test_agent.py'], input='y\n')
+        
+        # Should succeed (exit code 0 from script)
+        assert result.exit_code == 0 or "Running" in result.output
 
 
 class TestCLIKey:
     """Tests for key management commands."""
     
-    def test_key_add(self, mock_keyring):
+    def test_key_add(self, runner, mock_keyring):
         """Test adding a key to vault."""
-        runner = CliRunner()
-        
         result = runner.invoke(cli, ['key', 'add', 'TEST_KEY'], input='test-value\n')
         
         assert result.exit_code == 0
         assert "Added TEST_KEY to vault" in result.output
     
-    def test_key_list_empty(self, mock_keyring):
+    def test_key_list_empty(self, runner, mock_keyring):
         """Test listing keys when vault is empty."""
-        runner = CliRunner()
-        
         result = runner.invoke(cli, ['key', 'list'])
         
         assert result.exit_code == 0
         assert "No keys in vault" in result.output
     
-    def test_key_list_with_keys(self, mock_keyring):
+    def test_key_list_with_keys(self, runner, mock_keyring):
         """Test listing keys when vault has keys."""
-        runner = CliRunner()
-        
         # Add some keys
         store_key("KEY1", "value1")
         register_key("KEY1")
@@ -213,10 +169,8 @@ class TestCLIKey:
         assert "KEY1" in result.output
         assert "KEY2" in result.output
     
-    def test_key_remove_existing(self, mock_keyring):
+    def test_key_remove_existing(self, runner, mock_keyring):
         """Test removing an existing key."""
-        runner = CliRunner()
-        
         # Add key first
         store_key("TO_REMOVE", "value")
         register_key("TO_REMOVE")
@@ -226,10 +180,8 @@ class TestCLIKey:
         assert result.exit_code == 0
         assert "Removed TO_REMOVE" in result.output
     
-    def test_key_remove_nonexistent(self, mock_keyring):
+    def test_key_remove_nonexistent(self, runner, mock_keyring):
         """Test removing a non-existent key."""
-        runner = CliRunner()
-        
         result = runner.invoke(cli, ['key', 'remove', 'NONEXISTENT'])
         
         # Should not error, just report removal
@@ -239,93 +191,125 @@ class TestCLIKey:
 class TestCLIHelp:
     """Tests for CLI help and general functionality."""
     
-    def test_cli_help(self):
+    def test_cli_help(self, runner):
         """Test CLI help command."""
-        runner = CliRunner()
-        
         result = runner.invoke(cli, ['--help'])
         
         assert result.exit_code == 0
         assert "Backpack Agent Container CLI" in result.output
     
-    def test_init_help(self):
+    def test_init_help(self, runner):
         """Test init command help."""
-        runner = CliRunner()
-        
         result = runner.invoke(cli, ['init', '--help'])
         
         assert result.exit_code == 0
         assert "Initialize a new agent.lock file" in result.output
     
-    def test_run_help(self):
+    def test_run_help(self, runner):
         """Test run command help."""
-        runner = CliRunner()
-        
         result = runner.invoke(cli, ['run', '--help'])
         
         assert result.exit_code == 0
         assert "Run an agent with JIT variable injection" in result.output
     
-    def test_key_help(self):
+    def test_key_help(self, runner):
         """Test key command help."""
-        runner = CliRunner()
-        
         result = runner.invoke(cli, ['key', '--help'])
         
         assert result.exit_code == 0
         assert "Manage keys in personal vault" in result.output
 
-    def test_quickstart_help(self):
+    def test_quickstart_help(self, runner):
         """Test quickstart command help."""
-        runner = CliRunner()
         result = runner.invoke(cli, ['quickstart', '--help'])
         assert result.exit_code == 0
         assert "quickstart" in result.output and "Interactive" in result.output
 
-    def test_template_help(self):
+    def test_template_help(self, runner):
         """Test template command help."""
-        runner = CliRunner()
         result = runner.invoke(cli, ['template', '--help'])
         assert result.exit_code == 0
         assert "template" in result.output
 
-    def test_demo_help(self):
+    def test_demo_help(self, runner):
         """Test demo command help."""
-        runner = CliRunner()
         result = runner.invoke(cli, ['demo', '--help'])
         assert result.exit_code == 0
         assert "demo" in result.output
 
+    def test_entry_point_version_fast_path(self, capsys):
+        """Test `backpack version` is answered without loading the click CLI."""
+        from backpack import __version__
+        from backpack.__main__ import main
+
+        with patch("backpack.cli.cli") as mock_cli:
+            main(["version"])
+
+        mock_cli.assert_not_called()
+        assert capsys.readouterr().out == f"backpack version {__version__}\n"
+
+    def test_entry_point_delegates(self):
+        """Test every other command line is passed to the click CLI."""
+        from backpack.__main__ import main
+
+        with patch("backpack.cli.cli") as mock_cli:
+            main(["version", "--help"])
+
+        mock_cli.assert_called_once_with(args=["version", "--help"])
+
+
+class TestCLILogging:
+    """Tests for deferred CLI logging setup."""
+
+    def test_help_does_not_configure_logging(self, runner):
+        """Test that --help returns without setting up logging."""
+        with patch("backpack.cli._configure_logging") as mock_configure:
+            result = runner.invoke(cli, ['--help'])
+
+        assert result.exit_code == 0
+        mock_configure.assert_not_called()
+
+    def test_command_configures_logging(self, runner):
+        """Test that running a command sets up logging first."""
+        with patch("backpack.cli._configure_logging") as mock_configure:
+            result = runner.invoke(cli, ['version'])
+
+        assert result.exit_code == 0
+        mock_configure.assert_called_once()
+
 
 class TestCLIQuickstart:
     """Tests for quickstart command."""
 
-    def test_quickstart_non_interactive(self, mock_keyring, temp_dir, clean_env):
+    def test_quickstart_credential_parsing(self, runner, clean_env):
+        """Test credentials split on commas and whitespace and skip invalid names."""
+        with runner.isolated_filesystem(), patch("backpack.cli.AgentLock.create") as mock_create:
+            result = runner.invoke(
+                cli, ['quickstart'], input="Bot\n OPENAI_API_KEY,, bad!name  TWITTER_TOKEN \n\n"
+            )
+        assert result.exit_code == 0
+        creds = mock_create.call_args[0][0]
+        assert list(creds) == ["OPENAI_API_KEY", "TWITTER_TOKEN"]
+
+    def test_quickstart_non_interactive(self, runner, mock_keyring, in_temp_dir, clean_env):
         """Test quickstart with --non-interactive creates agent.lock and agent.py."""
-        runner = CliRunner()
-        original_dir = os.getcwd()
-        try:
-            os.chdir(temp_dir)
-            result = runner.invoke(cli, ['quickstart', '--non-interactive'])
-            assert result.exit_code == 0
-            assert os.path.exists('agent.lock')
-            assert os.path.exists('agent.py')
-            assert "Next steps" in result.output
-            agent_lock = AgentLock()
-            agent_lock.master_key = "default-key"
-            data = agent_lock.read()
-            assert data is not None
-            assert "OPENAI_API_KEY" in data["credentials"]
-        finally:
-            os.chdir(original_dir)
+        result = runner.invoke(cli, ['quickstart', '--non-interactive'])
+        assert result.exit_code == 0
+        assert os.path.exists('agent.lock')
+        assert os.path.exists('agent.py')
+        assert "Next steps" in result.output
+        agent_lock = AgentLock()
+        agent_lock.master_key = "default-key"
+        data = agent_lock.read()
+        assert data is not None
+        assert "OPENAI_API_KEY" in data["credentials"]
 
 
 class TestCLITemplate:
     """Tests for template list and use."""
 
-    def test_template_list(self):
+    def test_template_list(self, runner):
         """Test template list shows available templates."""
-        runner = CliRunner()
         result = runner.invoke(cli, ['template', 'list'])
         assert result.exit_code == 0
         assert (
@@ -334,28 +318,55 @@ class TestCLITemplate:
             or "twitter_bot" in result.output
         )
 
-    def test_template_use(self, mock_keyring, temp_dir, clean_env):
+    def test_template_use(self, runner, mock_keyring, in_temp_dir, clean_env):
         """Test template use creates agent.lock and agent.py from template."""
-        runner = CliRunner()
-        original_dir = os.getcwd()
+        result = runner.invoke(cli, ['template', 'use', 'financial_analyst'])
+        assert result.exit_code == 0
+        assert os.path.exists('agent.lock')
+        assert os.path.exists('agent.py')
+        assert "OPENAI_API_KEY" in result.output
+        agent_lock = AgentLock()
+        agent_lock.master_key = "default-key"
+        data = agent_lock.read()
+        assert data is not None
+        assert "OPENAI_API_KEY" in data["credentials"]
+
+    def test_template_use_copies_supporting_files(self, runner, mock_keyring, temp_dir, clean_env):
+        """Test template use copies extra files without overwriting existing ones."""
+        target = os.path.join(temp_dir, "bot")
+        os.makedirs(target)
+        with open(os.path.join(target, "notes.txt"), "w") as f:
+            f.write("mine")
+
+        template_dir = os.path.join(temp_dir, "templates", "demo")
+        os.makedirs(os.path.join(template_dir, "assets"))
+        for rel, content in (
+            ("manifest.json", '{"credentials": []}'),
+            ("agent.py", "print('hi')"),
+            ("notes.txt", "template"),
+            (os.path.join("assets", "prompt.txt"), "hello"),
+        ):
+            with open(os.path.join(template_dir, rel), "w") as f:
+                f.write(content)
+
+        os.chmod(target, 0o755)
+        os.chmod(template_dir, 0o555)
         try:
-            os.chdir(temp_dir)
-            result = runner.invoke(cli, ['template', 'use', 'financial_analyst'])
-            assert result.exit_code == 0
-            assert os.path.exists('agent.lock')
-            assert os.path.exists('agent.py')
-            assert "OPENAI_API_KEY" in result.output
-            agent_lock = AgentLock()
-            agent_lock.master_key = "default-key"
-            data = agent_lock.read()
-            assert data is not None
-            assert "OPENAI_API_KEY" in data["credentials"]
+            with patch("backpack.cli._get_templates_dir", return_value=os.path.dirname(template_dir)):
+                result = runner.invoke(cli, ['template', 'use', 'demo', '--dir', target])
         finally:
-            os.chdir(original_dir)
+            os.chmod(template_dir, 0o755)
 
-    def test_template_use_invalid(self):
+        assert result.exit_code == 0
+        # The target directory keeps its own mode rather than the template's
+        assert stat.S_IMODE(os.stat(target).st_mode) == 0o755
+        assert os.path.exists(os.path.join(target, "assets", "prompt.txt"))
+        assert not os.path.exists(os.path.join(target, "manifest.json"))
+        with open(os.path.join(target, "notes.txt")) as f:
+            assert f.read() == "mine"
+
+    def test_template_use_invalid(self, runner):
         """Test template use with invalid name exits with error."""
-        runner = CliRunner()
         result = runner.invoke(cli, ['template', 'use', 'nonexistent_template_xyz'])
         assert result.exit_code == 1
         assert "not found" in result.output or "Template" in result.output
@@ -364,40 +375,43 @@ class TestCLITemplate:
 class TestCLIDemo:
     """Tests for demo command."""
 
-    def test_demo_runs(self):
+    def test_demo_runs(self, runner):
         """Test demo command runs and shows before/after content."""
-        runner = CliRunner()
         result = runner.invoke(cli, ['demo', '--fast'])
         assert result.exit_code == 0
         assert "BEFORE" in result.output and "AFTER" in result.output
         assert "JIT" in result.output or "injection" in result.output.lower()
 
+    def test_demo_single_write(self, runner):
+        """Test demo emits its banner with a single echo."""
+        with patch("backpack.cli.click.echo") as mock_echo:
+            result = runner.invoke(cli, ['demo'])
+        assert result.exit_code == 0
+        mock_echo.assert_called_once()
+        assert "Try it:" in mock_echo.call_args[0][0]
+
 
+@pytest.mark.usefixtures("fast_kdf")
 class TestCLIIntegration:
     """Integration tests for CLI workflow."""
     
-    def test_full_workflow(self, mock_keyring, temp_dir):
+    @pytest.mark.integration
+    def test_full_workflow(self, runner, mock_keyring, in_temp_dir):
         """Test complete CLI workflow: add key, init, run."""
-        runner = CliRunner()
-        original_dir = os.getcwd()
+        # Add key
+        runner.invoke(cli, ['key', 'add', 'WORKFLOW_KEY'], input='workflow-value\n')
         
-        try:
-            os.chdir(temp_dir)
-            
-            # Add key
-            runner.invoke(cli, ['key', 'add', 'WORKFLOW_KEY'], input='workflow-value\n')
-            
-            # Initialize agent
-            runner.invoke(cli, [
-                'init',
-                '--credentials', 'WORKFLOW_KEY',
-                '--personality', 'Workflow test agent'
-            ])
-            
-            # Create test script
-            test_script = os.path.join(temp_dir, "workflow_agent.py")
-            with open(test_script, 'w') as f:
-                f.write("""
+        # Initialize agent
+        runner.invoke(cli, [
+            'init',
+            '--credentials', 'WORKFLOW_KEY',
+            '--personality', 'Workflow test agent'
+        ])
+        
+        # Create test script
+        test_script = "workflow_agent.py"
+        with open(test_script, 'w') as f:
+            f.write("""
 import os
 key = os.environ.get('WORKFLOW_KEY')
 prompt = os.environ.get('AGENT_SYSTEM_PROMPT')
@@ -408,11 +422,9 @@ else:
     print("FAILED")
     exit(1)
 """)
-            
-            # Run agent
-            result = runner.invoke(cli, ['run', 'workflow_agent.py'], input='y\n')
-            
-            # Should contain success indicators
-            assert "SUCCESS" in result.output or result.exit_code == 0
-        finally:
-            os.chdir(original_dir)
+        
+        # Run agent
+        result = runner.invoke(cli, ['run', 'workflow_agent.py'], input='y\n')
+        
+        # Should contain success indicators
+        assert "SUCCESS" in result.output or result.exit_code == 0
@@ -3,7 +3,6 @@ import os
 from unittest.mock import patch
 
 import pytest
-from click.testing import CliRunner
 
 from backpack.cli import (
     _configure_logging,
@@ -12,8 +11,10 @@ from backpack.cli import (
     cli,
     handle_error,
 )
+from backpack.agent_lock import AgentLock
+from backpack.crypto import derive_key, encrypt_many
 from backpack.keychain import store_key
-from backpack.exceptions import BackpackError, KeychainDeletionError, KeychainStorageError
+from backpack.exceptions import BackpackError, KeychainDeletionError, KeychainStorageError, KeyNotFoundError
 
 
 class TestCLICoverage:
@@ -33,6 +34,16 @@ class TestCLICoverage:
         assert "Error: Test Error" in captured.err
         assert "Error details" in captured.err
 
+    def test_handle_error_tip_single_write(self):
+        error = KeyNotFoundError("OPENAI_API_KEY")
+        with patch("backpack.cli.click.echo") as mock_echo, pytest.raises(SystemExit):
+            handle_error(error)
+        mock_echo.assert_called_once()
+        message = mock_echo.call_args[0][0]
+        assert "OPENAI_API_KEY" in message
+        assert "backpack key list" in message
+        assert mock_echo.call_args[1] == {"err": True}
+
     def test_handle_error_unexpected_error(self, capsys):
         error = Exception("Unexpected")
         with pytest.raises(SystemExit) as excinfo:
@@ -51,16 +62,14 @@ class TestCLICoverage:
         captured = capsys.readouterr()
         assert "Caused by: Cause" in captured.err
 
-    def test_quickstart_interactive_cancel(self):
-        runner = CliRunner()
+    def test_quickstart_interactive_cancel(self, runner):
         with runner.isolated_filesystem():
             with open("agent.lock", "w") as f:
                 f.write("{}")
             result = runner.invoke(cli, ["quickstart"], input="n\n")
             assert "Cancelled." in result.output
 
-    def test_quickstart_interactive_overwrite_agent_py_cancel(self):
-        runner = CliRunner()
+    def test_quickstart_interactive_overwrite_agent_py_cancel(self, runner):
         with runner.isolated_filesystem():
             with open("agent.py", "w") as f:
                 f.write("old code")
@@ -70,8 +79,7 @@ class TestCLICoverage:
             assert "Writing starter script to agent_quickstart.py instead." in result.output
             assert os.path.exists("agent_quickstart.py")
 
-    def test_quickstart_skip_empty_credentials(self):
-        runner = CliRunner()
+    def test_quickstart_skip_empty_credentials(self, runner):
         with runner.isolated_filesystem():
             # Provide inputs: agent name, empty credentials (should skip), personality
             input_str = "Agent\n   \nPersonality\n" 
@@ -83,8 +91,7 @@ class TestCLICoverage:
             # But here we pass "   ". 
             # Actually line 122 "if not c: continue" handles empty splits.
 
-    def test_quickstart_skip_invalid_credentials(self):
-        runner = CliRunner()
+    def test_quickstart_skip_invalid_credentials(self, runner):
         with runner.isolated_filesystem():
             # Inputs: Agent, invalid!cred, Personality
             input_str = "Agent\ninvalid!cred\nPersonality\n"
@@ -92,51 +99,76 @@ class TestCLICoverage:
             # Should use default OPENAI_API_KEY if no valid creds
             assert "Created agent.lock" in result.output
 
-    def test_quickstart_error(self):
-        runner = CliRunner()
+    def test_quickstart_error(self, runner):
         with patch('backpack.cli.AgentLock.create', side_effect=BackpackError("Failed")):
-            result = runner.invoke(cli, ["quickstart", "--non-interactive"])
+            result = runner.invoke(cli, ["quickstart", "--non-interactive"], standalone_mode=False)
+            assert result.exit_code == 1
             assert "Error: Failed" in result.output
 
-    def test_quickstart_unexpected_error(self):
-        runner = CliRunner()
+    def test_quickstart_unexpected_error(self, runner):
         with patch('backpack.cli.AgentLock.create', side_effect=Exception("Unexpected")):
             result = runner.invoke(cli, ["quickstart", "--non-interactive"])
             assert "Unexpected error: Unexpected" in result.output
 
-    def test_init_invalid_credential_name(self):
-        runner = CliRunner()
+    def test_init_invalid_credential_name(self, runner):
         with runner.isolated_filesystem():
             result = runner.invoke(cli, ["init", "--credentials", "invalid!name"])
-            assert "Error: Invalid credential name: invalid!name" in result.output
-
-    def test_init_overwrite_cancel(self):
-        runner = CliRunner()
+            assert result.exit_code == 2
+            assert "Invalid credential name: invalid!name" in result.output
+            assert not os.path.exists("agent.lock")
+
+    def test_key_commands_accept_vault_key_names(self, runner):
+        """Names the vault accepts, such as ones with '-' or '.', reach the keychain."""
+        with patch('backpack.cli.get_key', return_value=None), \
+             patch('backpack.cli.store_key') as mock_store, \
+             patch('backpack.cli.register_key'), \
+             patch('backpack.cli.delete_key') as mock_delete:
+            result = runner.invoke(cli, ["key", "add", "my.key", "--value", "val"])
+            assert result.exit_code == 0
+            result = runner.invoke(cli, ["key", "remove", "my-key"])
+            assert result.exit_code == 0
+        mock_store.assert_called_once_with("my.key", "val")
+        mock_delete.assert_called_once_with("my-key")
+
+    def test_init_overwrite_cancel(self, runner):
         with runner.isolated_filesystem():
             with open("agent.lock", "w") as f:
                 f.write("{}")
             result = runner.invoke(cli, ["init"], input="n\n")
             assert "Cancelled." in result.output
+            with open("agent.lock") as f:
+                assert f.read() == "{}"
 
-    def test_init_error(self):
-        runner = CliRunner()
+    def test_init_overwrite_confirm(self, runner):
+        with runner.isolated_filesystem():
+            with open("agent.lock", "w") as f:
+                f.write("{}")
+            with patch("backpack.agent_lock.derive_key", wraps=derive_key) as mock_derive, \
+                 patch("backpack.agent_lock.encrypt_many", wraps=encrypt_many) as mock_encrypt:
+                result = runner.invoke(cli, ["init", "--credentials", "API_KEY"], input="y\n")
+            assert "Created agent.lock with 1 credential placeholders" in result.output
+            # The refused create and the confirmed retry share one derivation and encryption
+            assert mock_derive.call_count == 1
+            assert mock_encrypt.call_count == 1
+            assert AgentLock().read_layer("credentials") == {"API_KEY": "placeholder_api_key"}
+
+    def test_init_error(self, runner):
         with runner.isolated_filesystem():
             with patch('backpack.cli.AgentLock.create', side_effect=BackpackError("Failed")):
-                result = runner.invoke(cli, ["init"])
+                result = runner.invoke(cli, ["init"], standalone_mode=False)
+                assert result.exit_code == 1
                 assert "Error: Failed" in result.output
 
-    def test_init_unexpected_error(self):
-        runner = CliRunner()
+    def test_init_unexpected_error(self, runner):
         with runner.isolated_filesystem():
             with patch('backpack.cli.AgentLock.create', side_effect=Exception("Unexpected")):
                 result = runner.invoke(cli, ["init"])
                 assert "Unexpected error: Unexpected" in result.output
 
-    def test_run_access_denied(self, clean_env, mock_keyring):
+    def test_run_access_denied(self, runner, clean_env, mock_keyring):
         if "AGENT_MASTER_KEY" in os.environ:
             del os.environ["AGENT_MASTER_KEY"]
             
-        runner = CliRunner()
         with runner.isolated_filesystem():
             # Create dummy script
             with open("script.py", "w") as f:
@@ -156,37 +188,59 @@ class TestCLICoverage:
             assert "Running" in result.output
             assert "script.py" in result.output
 
-    def test_add_key_empty_value(self):
-        runner = CliRunner()
+    def test_run_batched_consent(self, runner, clean_env, mock_keyring):
+        """Test several keys are approved with one prompt, or narrowed to a subset."""
+        with runner.isolated_filesystem():
+            with open("script.py", "w") as f:
+                f.write("pass")
+            store_key("KEY_A", "value_a")
+            store_key("KEY_B", "value_b")
+            runner.invoke(cli, ['init', '--credentials', 'KEY_A,KEY_B', '--personality', 'Test'])
+
+            with patch("subprocess.run") as mock_run:
+                mock_run.return_value.returncode = 0
+
+                result = runner.invoke(cli, ["run", "script.py"], input="y\n")
+                assert result.output.count("Allow access?") == 1
+                assert "  - KEY_A (found in vault)" in result.output
+                env = mock_run.call_args[1]["env"]
+                assert env["KEY_A"] == "value_a" and env["KEY_B"] == "value_b"
+
+                result = runner.invoke(cli, ["run", "script.py"], input="n\nKEY_A\n")
+                env = mock_run.call_args[1]["env"]
+                assert env["KEY_A"] == "value_a" and "KEY_B" not in env
+                assert "Access denied for KEY_B" in result.output
+
+    def test_add_key_empty_value(self, runner):
         result = runner.invoke(cli, ["key", "add", "test_key", "--value", ""])
         assert "Error: Key value cannot be empty" in result.output
 
-    def test_add_key_overwrite_cancel(self):
-        runner = CliRunner()
+    def test_add_key_overwrite_cancel(self, runner):
         with patch('backpack.cli.get_key', return_value="existing"):
             result = runner.invoke(cli, ["key", "add", "test_key", "--value", "new"], input="n\n")
             assert "Cancelled." in result.output
 
-    def test_add_key_error(self):
-        runner = CliRunner()
-        with patch('backpack.cli.store_key', side_effect=KeychainStorageError("test_key", "Failed")):
-             result = runner.invoke(cli, ["key", "add", "test_key", "--value", "val"])
-             assert "Error: Failed" in result.output
-
-    def test_add_key_unexpected_error(self):
-        runner = CliRunner()
-        with patch('backpack.cli.store_key', side_effect=Exception("Unexpected")):
-             result = runner.invoke(cli, ["key", "add", "test_key", "--value", "val"])
-             assert "Unexpected error: Unexpected" in result.output
-
-    def test_remove_key_error(self):
-        runner = CliRunner()
+    def test_add_key_error(self, runner):
+        with patch('backpack.cli.get_key', return_value=None), \
+             patch('backpack.cli.store_key', side_effect=KeychainStorageError("test_key", "Injected failure")):
+            result = runner.invoke(cli, ["key", "add", "test_key", "--value", "val"], standalone_mode=False)
+            assert result.exit_code == 1
+            assert "Error: Failed to store key 'test_key' in keychain" in result.output
+            assert "Injected failure" in result.output
+
+    def test_add_key_unexpected_error(self, runner):
+        with patch('backpack.cli.get_key', return_value=None), \
+             patch('backpack.cli.store_key', side_effect=Exception("Injected failure")):
+            result = runner.invoke(cli, ["key", "add", "test_key", "--value", "val"])
+            assert result.exit_code == 1
+            assert "Unexpected error: Injected failure" in result.output
+
+    def test_remove_key_error(self, runner):
         with patch('backpack.cli.delete_key', side_effect=KeychainDeletionError("test_key", "Failed")):
             result = runner.invoke(cli, ["key", "remove", "test_key"])
             assert "Error: Failed" in result.output
 
-    def test_remove_key_unexpected_error(self):
-        runner = CliRunner()
+    def test_remove_key_unexpected_error(self, runner):
         with patch('backpack.cli.delete_key', side_effect=Exception("Unexpected")):
             result = runner.invoke(cli, ["key", "remove", "test_key"])
             assert "Unexpected error: Unexpected" in result.output
@@ -206,44 +260,30 @@ class TestCLICoverage:
         with patch('backpack.cli._get_templates_dir', return_value="/non/existent"):
             assert _list_template_names() == []
 
-    def test_template_list_empty(self):
-        runner = CliRunner()
+    def test_template_list_empty(self, runner):
         with patch('backpack.cli._list_template_names', return_value=[]):
             result = runner.invoke(cli, ["template", "list"])
             assert "No templates found." in result.output
 
-    def test_template_list_broken_manifest(self):
-        runner = CliRunner()
-        with runner.isolated_filesystem():
-            os.makedirs("tpl")
-            with open("tpl/manifest.json", "w") as f:
-                f.write("invalid json")
-            
-            with patch('backpack.cli._get_templates_dir', return_value=os.getcwd()), \
-                 patch('backpack.cli._list_template_names', return_value=["tpl"]):
-                result = runner.invoke(cli, ["template", "list"])
-                assert "tpl" in result.output
+    def test_template_list_broken_manifest(self, runner, broken_templates_dir):
+        with patch('backpack.cli._get_templates_dir', return_value=str(broken_templates_dir)), \
+             patch('backpack.cli._list_template_names', return_value=["tpl"]):
+            result = runner.invoke(cli, ["template", "list"])
+            assert "tpl" in result.output
 
-    def test_template_use_no_manifest(self):
-        runner = CliRunner()
+    def test_template_use_no_manifest(self, runner):
         with runner.isolated_filesystem():
             os.makedirs("tpl")
             with patch('backpack.cli._get_templates_dir', return_value=os.getcwd()):
                 result = runner.invoke(cli, ["template", "use", "tpl"])
                 assert "has no manifest.json" in result.output
 
-    def test_template_use_invalid_manifest(self):
-        runner = CliRunner()
-        with runner.isolated_filesystem():
-            os.makedirs("tpl")
-            with open("tpl/manifest.json", "w") as f:
-                f.write("invalid json")
-            with patch('backpack.cli._get_templates_dir', return_value=os.getcwd()):
-                result = runner.invoke(cli, ["template", "use", "tpl"])
-                assert "Invalid manifest" in result.output
+    def test_template_use_invalid_manifest(self, runner, broken_templates_dir, in_temp_dir):
+        with patch('backpack.cli._get_templates_dir', return_value=str(broken_templates_dir)):
+            result = runner.invoke(cli, ["template", "use", "tpl"])
+            assert "Invalid manifest" in result.output
 
-    def test_template_use_overwrite_lock_skip(self):
-        runner = CliRunner()
+    def test_template_use_overwrite_lock_skip(self, runner):
         with runner.isolated_filesystem():
             os.makedirs("tpl")
             with open("tpl/manifest.json", "w") as f:
@@ -255,8 +295,7 @@ class TestCLICoverage:
                 result = runner.invoke(cli, ["template", "use", "tpl"], input="n\n")
                 assert "Skipped agent.lock." in result.output
 
-    def test_template_use_overwrite_agent_py_skip(self):
-        runner = CliRunner()
+    def test_template_use_overwrite_agent_py_skip(self, runner):
         with runner.isolated_filesystem():
             os.makedirs("tpl")
             with open("tpl/manifest.json", "w") as f:
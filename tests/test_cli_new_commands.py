@@ -1,3 +1,4 @@
+import json
 import os
 import zipfile
 from unittest.mock import patch
@@ -16,6 +17,14 @@ class TestCLINewCommands:
             result = runner.invoke(cli, ["status"])
             assert "No agent.lock found" in result.output
 
+    def test_status_unreachable_file(self):
+        runner = CliRunner()
+        for error in (PermissionError("denied"), NotADirectoryError("not a dir")):
+            with patch("backpack.cli.os.stat", side_effect=error):
+                result = runner.invoke(cli, ["status"])
+            assert result.exit_code == 0
+            assert "No agent.lock found" in result.output
+
     def test_status_corrupted_file(self):
         runner = CliRunner()
         with runner.isolated_filesystem():
@@ -42,6 +51,22 @@ class TestCLINewCommands:
             assert "Personality: 2 items" in result.output 
             assert "Memory: 1 items" in result.output
 
+    def test_status_json(self):
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            lock = AgentLock()
+            lock.create(
+                {"OPENAI_API_KEY": "placeholder"},
+                {"system_prompt": "You are a bot", "tone": "friendly"},
+                {"run_count": 1}
+            )
+
+            result = runner.invoke(cli, ["status", "--json"])
+            output = json.loads(result.output)
+            assert output["layers"]["credentials"] == ["OPENAI_API_KEY"]
+            assert output["layers"]["memory"] == {"run_count": 1}
+            assert '\n  "file_path"' in result.output
+
     def test_info(self):
         runner = CliRunner()
         result = runner.invoke(cli, ["info"])
@@ -87,6 +112,20 @@ class TestCLINewCommands:
                 assert "agent.py" in names
                 assert "agent.lock" in names
 
+    def test_export_compresses_entries(self):
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            with open("agent.lock", "w") as f:
+                f.write('{"layers": "' + "A" * 4096 + '"}')
+
+            result = runner.invoke(cli, ["export"])
+            assert result.exit_code == 0
+
+            with zipfile.ZipFile("backpack_agent.zip", "r") as zf:
+                info = zf.getinfo("agent.lock")
+                assert info.compress_type == zipfile.ZIP_DEFLATED
+                assert info.compress_size < info.file_size
+
     def test_export_custom_name(self):
         runner = CliRunner()
         with runner.isolated_filesystem():
@@ -115,11 +154,24 @@ class TestCLINewCommands:
             assert "Imported agent to ." in result.output
             assert os.path.exists("agent.py")
 
+    def test_import_lists_files_as_extracted(self):
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            with zipfile.ZipFile("test.zip", "w") as zf:
+                zf.writestr("agent.py", "print('hello')")
+                zf.writestr("agent.lock", "{}")
+
+            result = runner.invoke(cli, ["import", "test.zip", "--dir", "out"])
+            assert "  - agent.py\n  - agent.lock\n" in result.output
+            assert result.output.index("agent.lock") < result.output.index("Imported agent to out")
+            assert os.path.exists(os.path.join("out", "agent.lock"))
+
     def test_import_missing_file(self):
         runner = CliRunner()
         with runner.isolated_filesystem():
-            result = runner.invoke(cli, ["import", "missing.zip"])
+            result = runner.invoke(cli, ["import", "missing.zip", "--dir", "out"])
             assert "File missing.zip not found" in result.output
+            assert not os.path.exists("out")
 
     def test_import_bad_zip(self):
         runner = CliRunner()
@@ -3,10 +3,28 @@ Tests for crypto module - encryption and decryption functionality.
 """
 
 import base64
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
 import pytest
+from cryptography.fernet import Fernet
 
-from backpack.crypto import decrypt_data, derive_key, encrypt_data
+from backpack import crypto
+from backpack.crypto import (
+    DEFAULT_ITERATIONS,
+    MAX_ITERATIONS,
+    calibrate_iterations,
+    clear_key_cache,
+    decode_salt,
+    decrypt_data,
+    decrypt_many,
+    decrypt_with_key,
+    derive_key,
+    encrypt_data,
+    encrypt_many,
+    encrypt_with_key,
+    kdf_iterations,
+)
 from backpack.exceptions import (
     DecryptionError,
     InvalidPasswordError,
@@ -62,6 +80,127 @@ class TestDeriveKey:
         assert key1 != key2
 
 
+class TestDeriveKeyCache:
+    """Tests for the in-process derived key cache."""
+
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        clear_key_cache()
+        yield
+        clear_key_cache()
+
+    def test_repeat_salt_skips_kdf(self):
+        """Test a second derivation with the same password and salt is a cache hit."""
+        salt = b"cache-salt-1234"
+        key1, _ = derive_key("test-password", salt)
+
+        with patch("cryptography.hazmat.primitives.kdf.pbkdf2.PBKDF2HMAC") as mock_kdf:
+            key2, _ = derive_key("test-password", salt)
+
+        mock_kdf.assert_not_called()
+        assert key1 == key2
+
+    def test_different_password_misses(self):
+        """Test the cache is keyed by password as well as salt."""
+        salt = b"cache-salt-1234"
+        key1, _ = derive_key("password-one", salt)
+        key2, _ = derive_key("password-two", salt)
+
+        assert key1 != key2
+
+    def test_generated_salt_not_cached(self):
+        """Test keys for freshly generated salts are not kept."""
+        derive_key("test-password")
+
+        assert len(crypto._key_cache) == 0
+
+    def test_cache_is_bounded(self):
+        """Test the least recently used entry is evicted once the cache is full."""
+        with patch.object(crypto, "_KEY_CACHE_SIZE", 2):
+            derive_key("test-password", b"salt-aaaaaaaa")
+            derive_key("test-password", b"salt-bbbbbbbb")
+            derive_key("test-password", b"salt-cccccccc")
+
+        assert [salt for _, salt, _ in crypto._key_cache] == [b"salt-bbbbbbbb", b"salt-cccccccc"]
+
+    def test_clear_key_cache(self):
+        """Test clear_key_cache empties the cache."""
+        derive_key("test-password", b"cache-salt-1234")
+        clear_key_cache()
+
+        assert len(crypto._key_cache) == 0
+
+    def test_cipher_reused_per_key(self):
+        """Test one AES-GCM instance is shared by calls with the same key until the cache is cleared."""
+        key, salt = derive_key("test-password", b"cache-salt-1234")
+        encrypted = encrypt_with_key("secret", key, salt)
+
+        with patch("cryptography.hazmat.primitives.ciphers.aead.AESGCM") as mock_aesgcm:
+            assert decrypt_with_key(encrypted, key) == "secret"
+            encrypt_with_key("again", key, salt)
+            mock_aesgcm.assert_not_called()
+
+        clear_key_cache()
+        assert len(crypto._aead_cache) == 0
+
+
+class TestIterations:
+    """Tests for per-envelope PBKDF2 iteration counts."""
+
+    def test_envelope_records_iterations(self):
+        """Test the iteration count is stored and used again on decrypt."""
+        encrypted = encrypt_data("secret", "password", iterations=1500)
+
+        assert kdf_iterations(encrypted) == 1500
+        assert decrypt_data(encrypted, "password") == "secret"
+
+    def test_missing_iterations_defaults(self):
+        """Test envelopes without 'iter' use the historical default."""
+        encrypted = encrypt_data("secret", "password")
+        del encrypted["iter"]
+
+        assert kdf_iterations(encrypted) == DEFAULT_ITERATIONS
+        assert decrypt_data(encrypted, "password") == "secret"
+
+    def test_invalid_iterations(self):
+        """Test non-positive, non-integer or oversized counts are rejected."""
+        with pytest.raises(ValidationError):
+            derive_key("password", iterations=0)
+        with pytest.raises(ValidationError):
+            derive_key("password", iterations=MAX_ITERATIONS + 1)
+        with pytest.raises(ValidationError):
+            kdf_iterations({"data": "d", "salt": "s", "iter": "100000"})
+        with pytest.raises(ValidationError):
+            kdf_iterations({"data": "d", "salt": "s", "iter": 10**12})
+
+    def test_fast_mode_for_generated_secrets(self):
+        """Test fast=True derives with one iteration and decrypts without a flag."""
+        secret = "k" * 32
+        encrypted = encrypt_data("secret", secret, fast=True)
+
+        assert kdf_iterations(encrypted) == 1
+        assert decrypt_data(encrypted, secret) == "secret"
+        assert derive_key(secret, b"fast-salt-1234", fast=True) == derive_key(
+            secret, b"fast-salt-1234", iterations=1
+        )
+
+    def test_fast_mode_rejects_short_passwords(self):
+        """Test fast=True refuses passwords too short to be generated secrets."""
+        with pytest.raises(InvalidPasswordError):
+            encrypt_data("secret", "typed-password", fast=True)
+        with pytest.raises(InvalidPasswordError):
+            derive_key("typed-password", fast=True)
+
+    def test_calibrate_iterations(self, real_pbkdf2):
+        """Test calibration never goes below the default and is cached per target."""
+        iterations = calibrate_iterations(target_ms=1.0)
+
+        assert iterations == DEFAULT_ITERATIONS
+        with patch("cryptography.hazmat.primitives.kdf.pbkdf2.PBKDF2HMAC") as mock_kdf:
+            assert calibrate_iterations(target_ms=1.0) == iterations
+        mock_kdf.assert_not_called()
+
+
 class TestEncryptData:
     """Tests for data encryption."""
     
@@ -131,69 +270,89 @@ class TestEncryptData:
         assert result1["data"] != result2["data"]
 
 
+_PASSWORD = "test-password"
+
+# Plaintexts encrypted once for the whole module by encrypted_corpus
+_ROUND_TRIP_CASES = [
+    "simple",
+    "with spaces",
+    "with\nnewlines",
+    "with\ttabs",
+    "测试",
+    "🚀",
+    "a" * 1000
+]
+_CORPUS = [
+    "test data to encrypt",
+    "",
+    "x" * 1000,
+    "test!@#$%^&*()_+-=[]{}|;':\",./<>?",
+    "测试数据 🚀 émoji",
+    *_ROUND_TRIP_CASES,
+]
+
+
+@pytest.fixture(scope="module")
+def encrypted_corpus():
+    """Map each _CORPUS plaintext to an envelope encrypted with _PASSWORD.
+
+    One key is derived for the whole corpus; tests that alter an envelope
+    must copy it first.
+    """
+    key, salt = derive_key(_PASSWORD)
+    plaintexts = list(dict.fromkeys(_CORPUS))
+    return dict(zip(plaintexts, encrypt_many(plaintexts, key, salt)))
+
+
 class TestDecryptData:
     """Tests for data decryption."""
     
-    def test_decrypt_data_basic(self):
+    def test_decrypt_data_basic(self, encrypted_corpus):
         """Test basic decryption of data."""
         original_data = "test data to encrypt"
-        password = "test-password"
         
-        encrypted = encrypt_data(original_data, password)
-        decrypted = decrypt_data(encrypted, password)
+        decrypted = decrypt_data(encrypted_corpus[original_data], _PASSWORD)
         
         assert decrypted == original_data
     
-    def test_decrypt_data_empty_string(self):
+    def test_decrypt_data_empty_string(self, encrypted_corpus):
         """Test decryption of empty string."""
         original_data = ""
-        password = "test-password"
         
-        encrypted = encrypt_data(original_data, password)
-        decrypted = decrypt_data(encrypted, password)
+        decrypted = decrypt_data(encrypted_corpus[original_data], _PASSWORD)
         
         assert decrypted == original_data
     
-    def test_decrypt_data_long_string(self):
+    def test_decrypt_data_long_string(self, encrypted_corpus):
         """Test decryption of long string."""
         original_data = "x" * 1000
-        password = "test-password"
         
-        encrypted = encrypt_data(original_data, password)
-        decrypted = decrypt_data(encrypted, password)
+        decrypted = decrypt_data(encrypted_corpus[original_data], _PASSWORD)
         
         assert decrypted == original_data
     
-    def test_decrypt_data_special_characters(self):
+    def test_decrypt_data_special_characters(self, encrypted_corpus):
         """Test decryption with special characters."""
         original_data = "test!@#$%^&*()_+-=[]{}|;':\",./<>?"
-        password = "test-password"
         
-        encrypted = encrypt_data(original_data, password)
-        decrypted = decrypt_data(encrypted, password)
+        decrypted = decrypt_data(encrypted_corpus[original_data], _PASSWORD)
         
         assert decrypted == original_data
     
-    def test_decrypt_data_unicode(self):
+    def test_decrypt_data_unicode(self, encrypted_corpus):
         """Test decryption with unicode characters."""
         original_data = "测试数据 🚀 émoji"
-        password = "test-password"
         
-        encrypted = encrypt_data(original_data, password)
-        decrypted = decrypt_data(encrypted, password)
+        decrypted = decrypt_data(encrypted_corpus[original_data], _PASSWORD)
         
         assert decrypted == original_data
     
-    def test_decrypt_data_wrong_password(self):
+    def test_decrypt_data_wrong_password(self, encrypted_corpus):
         """Test that wrong password fails to decrypt."""
-        original_data = "test data"
-        correct_password = "correct-password"
-        wrong_password = "wrong-password"
-        
-        encrypted = encrypt_data(original_data, correct_password)
+        encrypted = encrypted_corpus["test data to encrypt"]
         
         with pytest.raises(DecryptionError):
-            decrypt_data(encrypted, wrong_password)
+            decrypt_data(encrypted, "wrong-password")
     
     def test_decrypt_data_corrupted_data(self):
         """Test that corrupted encrypted data fails to decrypt."""
@@ -208,36 +367,184 @@ class TestDecryptData:
         with pytest.raises(DecryptionError):
             decrypt_data(corrupted, password)
     
-    def test_decrypt_data_corrupted_salt(self):
+    def test_decrypt_data_corrupted_salt(self, encrypted_corpus):
         """Test that corrupted salt fails to decrypt."""
-        original_data = "test data"
-        password = "test-password"
-        encrypted = encrypt_data(original_data, password)
+        encrypted = dict(encrypted_corpus["test data to encrypt"])
         
         # Corrupt the salt
         encrypted["salt"] = "invalid-salt!!!"
         
         with pytest.raises((DecryptionError, ValidationError)):
-            decrypt_data(encrypted, password)
+            decrypt_data(encrypted, _PASSWORD)
     
-    def test_encrypt_decrypt_round_trip(self):
-        """Test multiple encrypt/decrypt round trips."""
-        test_cases = [
-            "simple",
-            "with spaces",
-            "with\nnewlines",
-            "with\ttabs",
-            "测试",
-            "🚀",
-            "a" * 1000
-        ]
-        
-        password = "test-password"
-        
-        for original_data in test_cases:
-            encrypted = encrypt_data(original_data, password)
-            decrypted = decrypt_data(encrypted, password)
-            assert decrypted == original_data, f"Failed for: {original_data[:50]}"
+    @pytest.mark.parametrize(
+        "original_data",
+        _ROUND_TRIP_CASES,
+        ids=["simple", "spaces", "newlines", "tabs", "cjk", "emoji", "long"],
+    )
+    def test_encrypt_decrypt_round_trip(self, encrypted_corpus, original_data):
+        """Test encrypt/decrypt round trips for assorted plaintexts."""
+        decrypted = decrypt_data(encrypted_corpus[original_data], _PASSWORD)
+        assert decrypted == original_data
+
+    @pytest.mark.slow
+    def test_encrypt_data_round_trip(self):
+        """Test encrypt_data() output decrypts with decrypt_data()."""
+        encrypted = encrypt_data("through encrypt_data", _PASSWORD)
+        assert decrypt_data(encrypted, _PASSWORD) == "through encrypt_data"
+
+
+class TestPreDerivedKey:
+    """Tests for encrypting and decrypting with an already-derived key."""
+
+    def test_encrypt_with_key_round_trip(self):
+        """Test that several values can share one derived key."""
+        key, salt = derive_key("test-password")
+
+        first = encrypt_with_key("first", key, salt)
+        second = encrypt_with_key("second", key, salt)
+
+        assert first["salt"] == second["salt"]
+        assert decode_salt(first) == salt
+        assert decrypt_with_key(first, key) == "first"
+        assert decrypt_with_key(second, key) == "second"
+
+    def test_encrypt_with_key_compatible_with_decrypt_data(self):
+        """Test that pre-derived encryption produces the regular format."""
+        key, salt = derive_key("test-password")
+
+        encrypted = encrypt_with_key("payload", key, salt)
+
+        assert decrypt_data(encrypted, "test-password") == "payload"
+
+    def test_decrypt_with_wrong_key(self):
+        """Test that a key derived from another password is rejected."""
+        encrypted = encrypt_data("payload", "test-password")
+        wrong_key, _ = derive_key("wrong-password", decode_salt(encrypted))
+
+        with pytest.raises(DecryptionError):
+            decrypt_with_key(encrypted, wrong_key)
+
+    def test_encrypt_many(self):
+        """Test that batch encryption round-trips each payload with a fresh IV."""
+        key, salt = derive_key("password")
+
+        encrypted = encrypt_many(["same", "same", b"other"], key, salt)
+
+        assert [decrypt_with_key(e, key) for e in encrypted] == ["same", "same", "other"]
+        assert encrypted[0]["data"] != encrypted[1]["data"]
+        assert all(decode_salt(e) == salt for e in encrypted)
+
+    def test_encrypt_many_draws_nonces_once(self):
+        """Test a batch takes all its nonces from a single urandom call, each one distinct."""
+        key, salt = derive_key("password")
+
+        with patch("backpack.crypto.os.urandom", wraps=crypto.os.urandom) as mock_urandom:
+            encrypted = encrypt_many(["a", "b", "c", "d"], key, salt)
+
+        mock_urandom.assert_called_once_with(48)
+        nonces = [base64.b64decode(e["nonce"]) for e in encrypted]
+        assert len(set(nonces)) == 4 and all(len(n) == 12 for n in nonces)
+
+    def test_encrypt_many_invalid_payload(self):
+        """Test that one invalid payload rejects the whole batch."""
+        key, salt = derive_key("password")
+
+        with pytest.raises(ValidationError):
+            encrypt_many(["ok", None], key, salt)  # type: ignore
+
+    def test_decrypt_many_derives_once_per_salt(self):
+        """Test batch decryption keeps input order and runs PBKDF2 once per distinct salt."""
+        clear_key_cache()
+        key, salt = derive_key("password")
+        batch = encrypt_many(["a", "b"], key, salt)
+        single = encrypt_data("c", "password")
+
+        with patch("backpack.crypto._derive_key_unchecked", wraps=crypto._derive_key_unchecked) as mock_derive:
+            result = decrypt_many([batch[0], single, batch[1]], "password")
+
+        assert result == ["a", "c", "b"]
+        assert mock_derive.call_count == 2
+
+    def test_decrypt_many_parallel_derivation(self):
+        """Test many distinct salts are derived on a thread pool and still decrypt in order."""
+        clear_key_cache()
+        encrypted = [encrypt_data(f"value{i}", "password") for i in range(5)]
+        encrypted.append(encrypted[0])
+
+        with patch("backpack.crypto.os.cpu_count", return_value=4):
+            with patch("concurrent.futures.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as mock_pool:
+                with patch("backpack.crypto._derive_key_unchecked", wraps=crypto._derive_key_unchecked) as mock_derive:
+                    result = decrypt_many(encrypted, "password")
+
+        mock_pool.assert_called_once_with(max_workers=4)
+        assert result == ["value0", "value1", "value2", "value3", "value4", "value0"]
+        assert mock_derive.call_count == 5
+
+    def test_decrypt_many_validates_password_once(self):
+        """Test the password is checked once per batch, not once per salt."""
+        encrypted = [encrypt_data("a", "password"), encrypt_data("b", "password")]
+
+        with patch("backpack.crypto._validate_password", wraps=crypto._validate_password) as mock_validate:
+            assert decrypt_many(encrypted, "password") == ["a", "b"]
+        mock_validate.assert_called_once_with("password")
+
+        with pytest.raises(InvalidPasswordError):
+            decrypt_many(encrypted, "")
+
+    def test_decrypt_many_wrong_password(self):
+        """Test batch decryption with the wrong password raises DecryptionError."""
+        encrypted = [encrypt_data("secret", "password")]
+
+        with pytest.raises(DecryptionError):
+            decrypt_many(encrypted, "wrong-password")
+
+    def test_envelope_uses_aes_gcm(self):
+        """Test new envelopes are version 3 with a 12-byte nonce and tagged ciphertext."""
+        encrypted = encrypt_data("secret", "password")
+
+        assert encrypted["v"] == 3
+        assert len(base64.b64decode(encrypted["nonce"])) == 12
+        assert len(base64.b64decode(encrypted["data"])) == len("secret") + 16
+
+    def test_decrypt_legacy_fernet_envelopes(self):
+        """Test version 1 (double base64) and version 2 (raw token) Fernet envelopes still decrypt."""
+        key, salt = derive_key("password")
+        token = Fernet(key).encrypt(b"legacy")
+        encoded_salt = base64.b64encode(salt).decode()
+        v1 = {"data": base64.b64encode(token).decode(), "salt": encoded_salt}
+        v2 = {"v": 2, "data": token.decode("ascii"), "salt": encoded_salt}
+
+        assert decrypt_data(v1, "password") == "legacy"
+        assert decrypt_with_key(v2, key) == "legacy"
+        assert decrypt_many([v1, v2], "password") == ["legacy", "legacy"]
+
+    def test_decrypt_tampered_envelope(self):
+        """Test a modified GCM ciphertext fails authentication."""
+        encrypted = encrypt_data("secret", "password")
+        raw = bytearray(base64.b64decode(encrypted["data"]))
+        raw[0] ^= 1
+        encrypted["data"] = base64.b64encode(bytes(raw)).decode()
+
+        with pytest.raises(DecryptionError, match="invalid token"):
+            decrypt_data(encrypted, "password")
+
+    def test_decrypt_unknown_envelope_version(self):
+        """Test envelopes from a newer format are rejected with DecryptionError."""
+        encrypted = encrypt_data("secret", "password")
+        encrypted["v"] = 99
+
+        with pytest.raises(DecryptionError, match="unsupported format"):
+            decrypt_data(encrypted, "password")
+
+    def test_encrypt_bytes_plaintext(self):
+        """Test that UTF-8 bytes encrypt to the same plaintext as the equivalent string."""
+        key, salt = derive_key("password")
+
+        encrypted = encrypt_with_key('{"name": "caf\u00e9"}'.encode(), key, salt)
+
+        assert decrypt_with_key(encrypted, key) == '{"name": "caf\u00e9"}'
+        assert decrypt_data(encrypt_data(b"raw bytes", "password"), "password") == "raw bytes"
 
 
 class TestCryptoValidation:
@@ -0,0 +1,60 @@
+"""
+Tests for the internal JSON helpers (orjson with stdlib fallback).
+"""
+
+import json
+
+import pytest
+
+from backpack import _json
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    """Run each test against orjson (when installed) and the stdlib fallback."""
+    if request.param == "orjson":
+        if _json.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(_json, "orjson", None)
+    return request.param
+
+
+class TestJsonHelpers:
+    """Tests for dumps/loads."""
+
+    def test_round_trip(self, backend):
+        """Test that documents survive a dumps/loads round trip."""
+        data = {"text": "测试 🚀", "count": 3, "nested": {"items": [1, 2.5, None, True]}}
+
+        assert _json.loads(_json.dumps(data)) == data
+
+    def test_indent(self, backend):
+        """Test that indent produces a multi-line document json can parse."""
+        text = _json.dumps({"a": {"b": 1}}, indent=True)
+
+        assert "\n  " in text
+        assert json.loads(text) == {"a": {"b": 1}}
+
+    def test_non_string_keys_match_stdlib(self, backend):
+        """Test that non-string keys are coerced like json.dumps does."""
+        assert _json.loads(_json.dumps({1: "one"})) == json.loads(json.dumps({1: "one"}))
+
+    def test_large_integers(self, backend):
+        """Test that integers wider than 64 bits are still serialized."""
+        assert _json.loads(_json.dumps({"big": 2**70})) == {"big": 2**70}
+
+    def test_loads_accepts_stdlib_nan(self, backend):
+        """Test that documents json.dumps wrote with NaN can be read back."""
+        result = _json.loads(json.dumps({"value": float("inf")}))
+
+        assert result["value"] == float("inf")
+
+    def test_loads_bytes(self, backend):
+        """Test that UTF-8 bytes can be parsed directly."""
+        assert _json.loads(b'{"key": "value"}') == {"key": "value"}
+
+    def test_loads_invalid(self, backend):
+        """Test that invalid documents raise JSONDecodeError."""
+        with pytest.raises(_json.JSONDecodeError):
+            _json.loads("not json")
@@ -3,20 +3,56 @@ Tests for keychain module - OS keychain integration.
 """
 
 import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
+import keyring
+import keyring.errors
 import pytest
 
-from backpack.keychain import SERVICE_NAME, delete_key, get_key, list_keys, register_key, store_key
+from backpack import keychain
+from backpack.exceptions import (
+    InvalidKeyNameError,
+    KeychainAccessError,
+    KeychainStorageError,
+    ValidationError,
+)
+from backpack.keychain import (
+    SERVICE_NAME,
+    delete_key,
+    get_key,
+    get_keys,
+    list_keys,
+    register_key,
+    register_keys,
+    store_key,
+)
 
 
-@pytest.fixture(autouse=True)
-def mock_audit_logger():
-    """Mock the audit logger to prevent file writes and verify calls."""
+def _seed_registry(mock_keyring, names):
+    """Write a registry listing names straight into the mocked keychain."""
+    mock_keyring[(SERVICE_NAME, "_registry")] = json.dumps({name: True for name in names})
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _patched_audit_logger():
+    """Replace the keychain audit logger once for the whole module."""
     with patch("backpack.keychain.audit_logger") as mock:
         yield mock
 
 
+@pytest.fixture(autouse=True)
+def mock_audit_logger(_patched_audit_logger):
+    """Mock the audit logger to prevent file writes and verify calls."""
+    _patched_audit_logger.reset_mock()
+    return _patched_audit_logger
+
+
 class TestStoreKey:
     """Tests for storing keys in keychain."""
     
@@ -38,19 +74,32 @@ class TestStoreKey:
         store_key("TEST_KEY", "value2")
         assert mock_keyring[(SERVICE_NAME, "TEST_KEY")] == "value2"
     
-    def test_store_key_special_characters(self, mock_keyring):
-        """Test storing key with special characters."""
-        value = "test!@#$%^&*()_+-=[]{}|;':\",./<>?"
-        store_key("SPECIAL_KEY", value)
-        
-        assert mock_keyring[(SERVICE_NAME, "SPECIAL_KEY")] == value
-    
-    def test_store_key_unicode(self, mock_keyring):
-        """Test storing key with unicode characters."""
-        value = "测试值 🚀"
-        store_key("UNICODE_KEY", value)
+    @pytest.mark.parametrize(
+        "value",
+        ["test!@#$%^&*()_+-=[]{}|;':\",./<>?", "测试值 🚀"],
+        ids=["special_characters", "unicode"],
+    )
+    def test_store_key_values(self, mock_keyring, value):
+        """Test storing values with special and unicode characters."""
+        store_key("VALUE_KEY", value)
         
-        assert mock_keyring[(SERVICE_NAME, "UNICODE_KEY")] == value
+        assert mock_keyring[(SERVICE_NAME, "VALUE_KEY")] == value
+
+    def test_store_key_validation_error_not_wrapped(self, mock_keyring):
+        """Test validation errors propagate unchanged rather than as KeychainStorageError."""
+        with pytest.raises(ValidationError, match="cannot be None") as exc_info:
+            store_key("TEST_KEY", None)
+
+        assert not isinstance(exc_info.value, KeychainStorageError)
+        assert (SERVICE_NAME, "TEST_KEY") not in mock_keyring
+
+    def test_store_key_keyword_arguments(self, mock_keyring):
+        """Test store_key accepts its arguments by keyword."""
+        store_key("TEST_KEY", key_value="value1")
+        store_key(key_name="OTHER_KEY", key_value="value2")
+
+        assert mock_keyring[(SERVICE_NAME, "TEST_KEY")] == "value1"
+        assert mock_keyring[(SERVICE_NAME, "OTHER_KEY")] == "value2"
 
 
 class TestGetKey:
@@ -78,6 +127,66 @@ class TestGetKey:
         
         assert result == ""
 
+    def test_get_key_keyword_argument(self, mock_keyring):
+        """Test get_key accepts key_name by keyword, including in its error message."""
+        mock_keyring[(SERVICE_NAME, "TEST_KEY")] = "test-value"
+
+        assert get_key(key_name="TEST_KEY") == "test-value"
+
+        with patch("keyring.get_password", side_effect=RuntimeError("boom")):
+            with pytest.raises(KeychainAccessError, match="TEST_KEY"):
+                get_key(key_name="TEST_KEY")
+
+
+class TestGetKeys:
+    """Tests for retrieving several keys at once."""
+
+    def test_get_keys_mixed(self, mock_keyring, mock_audit_logger):
+        """Test found and missing keys are both reported, with one audit event."""
+        mock_keyring[(SERVICE_NAME, "KEY1")] = "value1"
+        mock_keyring[(SERVICE_NAME, "KEY2")] = "value2"
+
+        result = get_keys(["KEY1", "KEY2", "MISSING"])
+
+        assert result == {"KEY1": "value1", "KEY2": "value2", "MISSING": None}
+        mock_audit_logger.log_event.assert_called_once_with(
+            "get_keys", {"service": SERVICE_NAME, "key_names": ["KEY1", "KEY2"]}
+        )
+
+    def test_get_keys_none_found(self, mock_keyring, mock_audit_logger):
+        """Test no audit event is written when nothing was found."""
+        assert get_keys(["MISSING"]) == {"MISSING": None}
+        mock_audit_logger.log_event.assert_not_called()
+
+    def test_get_keys_fetches_in_parallel(self, mock_keyring):
+        """Test lookups after the first run on a thread pool and keep input order."""
+        for i in range(4):
+            mock_keyring[(SERVICE_NAME, f"KEY{i}")] = f"value{i}"
+
+        with patch("concurrent.futures.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as mock_pool:
+            result = get_keys(["KEY3", "KEY0", "MISSING", "KEY2"])
+
+        mock_pool.assert_called_once_with(max_workers=3)
+        assert list(result.items()) == [("KEY3", "value3"), ("KEY0", "value0"), ("MISSING", None), ("KEY2", "value2")]
+
+    def test_get_keys_worker_error(self, mock_keyring):
+        """Test a keyring failure inside a worker surfaces as KeychainAccessError."""
+        def get_password(service, name):
+            if name == "BAD":
+                raise keyring.errors.KeyringError("locked")
+            return None
+
+        with patch("keyring.get_password", side_effect=get_password):
+            with pytest.raises(KeychainAccessError, match="BAD"):
+                get_keys(["KEY1", "KEY2", "BAD"])
+
+    def test_get_keys_validates_before_lookup(self, mock_keyring):
+        """Test an invalid name fails before any keychain access."""
+        with patch("keyring.get_password") as mock_get:
+            with pytest.raises(InvalidKeyNameError):
+                get_keys(["KEY1", "_private"])
+            mock_get.assert_not_called()
+
 
 class TestListKeys:
     """Tests for listing keys in registry."""
@@ -90,7 +199,7 @@ class TestListKeys:
     
     def test_list_keys_single(self, mock_keyring):
         """Test listing keys with one key."""
-        register_key("KEY1")
+        _seed_registry(mock_keyring, ["KEY1"])
         
         result = list_keys()
         
@@ -99,9 +208,7 @@ class TestListKeys:
     
     def test_list_keys_multiple(self, mock_keyring):
         """Test listing keys with multiple keys."""
-        register_key("KEY1")
-        register_key("KEY2")
-        register_key("KEY3")
+        _seed_registry(mock_keyring, ["KEY1", "KEY2", "KEY3"])
         
         result = list_keys()
         
@@ -141,6 +248,45 @@ class TestRegisterKey:
         result = list_keys()
         assert len(result) == 3
 
+    def test_register_keys_single_write(self, mock_keyring):
+        """Test registering several keys writes the registry once."""
+        with patch("keyring.set_password", wraps=keyring.set_password) as mock_set:
+            register_keys(["KEY1", "KEY2", "KEY1"])
+            assert mock_set.call_count == 1
+
+        assert list_keys() == {"KEY1": True, "KEY2": True}
+
+    def test_register_keys_already_registered(self, mock_keyring):
+        """Test no write happens when every key is already registered."""
+        register_keys(["KEY1"])
+        with patch("keyring.set_password") as mock_set:
+            register_key("KEY1")
+            mock_set.assert_not_called()
+
+    def test_register_key_concurrent_threads(self, mock_keyring):
+        """Test registrations from parallel threads are not lost to each other."""
+        real_list_keys = keychain.list_keys
+
+        def slow_list_keys():
+            registry = real_list_keys()
+            time.sleep(0.005)  # widen the read-modify-write window
+            return registry
+
+        with patch("backpack.keychain.list_keys", side_effect=slow_list_keys):
+            threads = [threading.Thread(target=register_key, args=(f"KEY{i}",)) for i in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert list_keys() == {f"KEY{i}": True for i in range(5)}
+
+    def test_register_keys_validates_first(self, mock_keyring):
+        """Test an invalid name fails before the registry is touched."""
+        with pytest.raises(InvalidKeyNameError):
+            register_keys(["KEY1", "_private"])
+        assert list_keys() == {}
+
 
 class TestDeleteKey:
     """Tests for deleting keys from keychain."""
@@ -175,17 +321,41 @@ class TestDeleteKey:
         result = list_keys()
         assert "REGISTRY_ONLY" not in result
 
+    def test_delete_unregistered_key_skips_registry_write(self, mock_keyring):
+        """Test the registry is not rewritten when the deleted name was never in it."""
+        register_key("KEEP")
+        with patch("keyring.set_password") as mock_set:
+            delete_key("NEVER_REGISTERED")
+            mock_set.assert_not_called()
+        assert list_keys() == {"KEEP": True}
+
+
+class TestLazyKeyringImport:
+    """Tests that keyring is only imported when the keychain is used."""
+
+    def test_import_does_not_load_keyring(self):
+        """Test importing the CLI and keychain modules leaves keyring unloaded."""
+        src_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+        code = "import sys, backpack.cli, backpack.keychain; print('keyring' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": src_dir},
+            check=True,
+        )
+        assert result.stdout.strip() == "False"
+
 
 class TestKeychainIntegration:
     """Integration tests for keychain operations."""
     
     def test_full_workflow(self, mock_keyring):
         """Test complete workflow: store, get, list, delete."""
-        # Store keys
+        # Store keys, then register them with one registry write
         store_key("KEY1", "value1")
-        register_key("KEY1")
         store_key("KEY2", "value2")
-        register_key("KEY2")
+        register_keys(["KEY1", "KEY2"])
         
         # List keys
         keys = list_keys()
@@ -208,8 +378,7 @@ class TestKeychainIntegration:
     
     def test_registry_persistence(self, mock_keyring):
         """Test that registry persists across operations."""
-        register_key("PERSIST1")
-        register_key("PERSIST2")
+        _seed_registry(mock_keyring, ["PERSIST1", "PERSIST2"])
         
         # Simulate reading registry again
         keys1 = list_keys()